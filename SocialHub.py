@@ -1,14 +1,499 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
+import os
+import queue
+import threading
+import time
+from contextlib import closing
+from functools import partial
+from connection_pool import ConnectionPool, DEFAULT_PRAGMAS
+from dashboard import run_dashboard
+from engagement_sketches import APPROX_QUERIES, EngagementSketches, answer_query as answer_approx_query
+from engagement_stats import STATS_QUERIES, stats_available
+from follow_graph import FollowGraph, answer_query as answer_graph_query
+from index_advisor import explain, indexes_used
+from instrumentation import QueryRecorder, instrumented_query, query_record
+from query_catalog import categories, load_catalog
+from result_cache import ResultCache, cache_key, database_version, frame_bytes
+from result_frames import EXPORT_FORMATS, EXPORT_MIME, export_cursor, export_frame, output_name
+from safe_query import run_guarded
+from snapshot import REFRESH_SECONDS, SnapshotManager
+from tag_similarity import TagIndex, answer_query as answer_tag_query
+from table_browser import (ROWID_COLUMN, SORT_COLUMN, approximate_row_count, indexed_columns, next_cursor,
+                           page_query, table_columns)
+
+DB_PATH = 'SocialHub.db'
+POOL_SIZE = 4
+POOL_PRAGMAS = dict(DEFAULT_PRAGMAS)
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_TTL_SECONDS = None
+DEFAULT_PAGE_SIZE = 100
+CUSTOM_TIME_BUDGET = 10.0
+CUSTOM_MAX_ROWS = 100000
+CUSTOM_MAX_MB = 64
+CUSTOM_PREVIEW_ROWS = 50
+DASHBOARD_VIEW = 'Dashboard'
+DASHBOARD_TIME_BUDGET = 30.0
+DASHBOARD_DEFAULT_PANELS = 6
+DASHBOARD_COLUMNS = 2
+ERD_PATH = '0002.jpg'
+SNAPSHOT_MODE = os.environ.get('SOCIALHUB_SNAPSHOT', '') not in ('', '0')
+SNAPSHOT_REFRESH_SECONDS = float(os.environ.get('SOCIALHUB_SNAPSHOT_REFRESH', REFRESH_SECONDS))
+QUERY_LOG_PATH = os.environ.get('SOCIALHUB_QUERY_LOG')
+QUERY_METRICS_PATH = os.environ.get('SOCIALHUB_QUERY_METRICS')
+
+# In-memory snapshot of the database, kept fresh by a background thread
+# (only with SOCIALHUB_SNAPSHOT set)
+@st.cache_resource
+def get_snapshot():
+    if not SNAPSHOT_MODE:
+        return None
+    return SnapshotManager(DB_PATH, interval=SNAPSHOT_REFRESH_SECONDS).start()
+
+# Connection pool shared by every session of the app; in snapshot mode its
+# connections read the current snapshot instead of the database file
+@st.cache_resource
+def get_pool():
+    pool = ConnectionPool(DB_PATH, max_size=POOL_SIZE, pragmas=POOL_PRAGMAS)
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        snapshot.serve(pool)
+    return pool
+
+# Function to get the version of the data queries see, used to key caches
+def current_version():
+    snapshot = get_snapshot()
+    return snapshot.version() if snapshot is not None else database_version(DB_PATH)
+
+# Query result cache shared by every session of the app
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS)
+
+# Per-query timings shared by every session of the app
+@st.cache_resource
+def get_query_recorder():
+    return QueryRecorder(log_path=QUERY_LOG_PATH, prom_path=QUERY_METRICS_PATH)
+
+# Function to mark the start of a panel's run; queries recorded from now on
+# count towards this panel, whose count covers only its latest run
+def start_panel(panel):
+    st.session_state["active_panel"] = panel
+    st.session_state.setdefault("panel_queries", {})[panel] = 0
+
+# Function to record a query against the panel that ran it
+def record_query(record):
+    record.panel = st.session_state.get("active_panel")
+    counts = st.session_state.setdefault("panel_queries", {})
+    counts[record.panel] = counts.get(record.panel, 0) + 1
+    get_query_recorder().record(record)
+
+# Function to show how many queries this panel's latest run recorded; called
+# at the end of a fragment so it is redrawn whenever the panel reruns
+def display_panel_queries(panel):
+    count = st.session_state.get("panel_queries", {}).get(panel, 0)
+    st.caption(f"{count} {'query' if count == 1 else 'queries'} in this panel's latest run")
+
+# Function to memoize a value per panel for this session: compute() only runs
+# when key differs from the one the stored value was computed for
+def session_memo(slot, key, compute):
+    memo = st.session_state.setdefault("panel_memo", {})
+    if slot not in memo or memo[slot][0] != key:
+        memo[slot] = (key, compute())
+    return memo[slot][1]
+
+# Function to run an in-memory engine step (an index or sketch build, or an
+# answer with its username/URL lookups) on a pooled connection and record it
+# like a query under label: connect is the pool checkout and phase ("build"
+# or "execute") the engine's own time. size(result) gives its (rows, bytes).
+def run_engine_step(label, phase, compute, size):
+    record = query_record(label)
+    started = time.perf_counter()
+    try:
+        with get_pool().connection() as conn:
+            connected = time.perf_counter()
+            result = compute(conn)
+    except Exception as e:
+        record.error = str(e)
+        record.total = time.perf_counter() - started
+        record_query(record)
+        raise
+    finished = time.perf_counter()
+    record.connect = connected - started
+    setattr(record, phase, finished - connected)
+    record.total = finished - started
+    record.rows, record.bytes = size(result)
+    record_query(record)
+    return result
+
+# Function to get the (rows, bytes) of an engine answer for its record
+def answer_size(answer):
+    return len(answer[0]), frame_bytes(answer[0])
 
 # Function to run SQL queries
-def run_query(query):
-    conn = sqlite3.connect('SocialHub.db')
-    result = pd.read_sql_query(query, conn)
-    conn.close()
+def run_query(query, params=None, use_cache=True):
+    if use_cache:
+        started = time.perf_counter()
+        cache = get_result_cache()
+        key = cache_key(query, params)
+        version = current_version()
+        result = cache.get(key, version)
+        if result is not None:
+            record_query(query_record(query, total=time.perf_counter() - started, rows=len(result),
+                                      bytes=frame_bytes(result), cache_hit=True))
+            return result
+
+    try:
+        result, record = instrumented_query(get_pool(), query, params)
+    except Exception as e:
+        record_query(query_record(query, error=str(e)))
+        raise
+    record_query(record)
+    if use_cache:
+        cache.put(key, version, result)
     return result
 
+# Function to browse a table one keyset page at a time
+def browse_table(table):
+    version = current_version()
+
+    def load_metadata():
+        with get_pool().connection() as conn:
+            return table_columns(conn, table), indexed_columns(conn, table), approximate_row_count(conn, table)
+
+    columns, sortable, approx_rows = session_memo("browse_metadata", (table, version), load_metadata)
+
+    selected_columns = st.multiselect("Columns", columns, default=columns, key=f"browse_columns_{table}")
+    col1, col2, col3, col4 = st.columns(4)
+    sort_column = col1.selectbox("Sort by", sortable, key=f"browse_sort_{table}")
+    descending = col1.checkbox("Descending", key=f"browse_desc_{table}")
+    filter_column = col2.selectbox("Filter column", [None] + sortable, key=f"browse_filter_{table}")
+    filter_value = col3.text_input("Filter value", key=f"browse_value_{table}")
+    page_size = col4.number_input("Rows per page", min_value=10, max_value=10000, value=DEFAULT_PAGE_SIZE, step=10,
+                                  key=f"browse_size_{table}")
+    if filter_column is None or filter_value == "":
+        filter_column, filter_value = None, None
+
+    # Remember where each page starts; changing any setting goes back to page one
+    signature = (tuple(selected_columns), sort_column, descending, filter_column, filter_value, page_size)
+    state = st.session_state.setdefault(f"browse_state_{table}", {"signature": None, "cursors": [None], "next": None})
+    if state["signature"] != signature:
+        state.update(signature=signature, cursors=[None], next=None)
+
+    if not selected_columns:
+        st.info("Select at least one column.")
+        return
+
+    query, params = page_query(table, selected_columns, page_size, cursor=state["cursors"][-1],
+                               sort_column=sort_column, descending=descending,
+                               filter_column=filter_column, filter_value=filter_value)
+    page = session_memo("browse_page", (cache_key(query, params), version), lambda: run_query(query, params))
+    state["next"] = next_cursor(page) if len(page) == page_size else None
+
+    st.subheader(f"{table} Table")
+    st.caption(f"Page {len(state['cursors'])} · about {approx_rows:,} rows in table")
+    page_frame = page.drop(columns=[ROWID_COLUMN, SORT_COLUMN], errors="ignore")
+    st.dataframe(page_frame)
+    display_downloads(f"{table} page {len(state['cursors'])}", frame=page_frame, key=f"browse_{table}")
+
+    prev_col, next_col = st.columns(2)
+    prev_col.button("◀ Previous", disabled=len(state["cursors"]) == 1, key=f"browse_prev_{table}",
+                    on_click=lambda: state["cursors"].pop())
+    next_col.button("Next ▶", disabled=state["next"] is None, key=f"browse_next_{table}",
+                    on_click=lambda: state["cursors"].append(state["next"]))
+
+# Function to run a custom query with limits, showing the first rows early.
+# The query runs on a worker thread; if the script is stopped (Cancel button or
+# any other rerun) the worker is interrupted through its cancel event. Returns
+# (frame, message level, message) with the row count and any truncation.
+def run_custom_query_guarded(query, time_budget, max_rows, max_bytes):
+    cache = get_result_cache()
+    key = cache_key(query)
+    version = current_version()
+    cached = cache.get(key, version)
+    if cached is not None:
+        # Only complete results are cached; the current caps still apply
+        reason = None
+        if len(cached) > max_rows:
+            cached, reason = cached.head(max_rows), "row cap"
+        nbytes = frame_bytes(cached)
+        if nbytes > max_bytes:
+            cached, reason = cached.head(int(len(cached) * max_bytes / nbytes)), "byte cap"
+        record_query(query_record(query, rows=len(cached), bytes=frame_bytes(cached), cache_hit=True))
+        if reason is not None:
+            return cached, "warning", f"Returned {len(cached):,} rows from cache — truncated by the {reason}."
+        return cached, "caption", f"Returned {len(cached):,} rows from cache."
+
+    chunks = queue.Queue()
+    cancel = threading.Event()
+    outcome = {}
+
+    def work():
+        try:
+            with get_pool().connection() as conn:
+                outcome["result"] = run_guarded(conn, query, time_budget=time_budget, max_rows=max_rows,
+                                                max_bytes=max_bytes, on_chunk=lambda chunk, rows: chunks.put(chunk),
+                                                cancel_event=cancel, preview_rows=CUSTOM_PREVIEW_ROWS)
+        except Exception as e:
+            outcome["error"] = e
+
+    status = st.empty()
+    preview = st.empty()
+    st.button("Cancel ⏹", key="cancel_custom_query")
+    worker = threading.Thread(target=work, daemon=True)
+    started = time.perf_counter()
+    preview_rows = []
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.1)
+            while not chunks.empty() and sum(len(chunk) for chunk in preview_rows) < CUSTOM_PREVIEW_ROWS:
+                preview_rows.append(chunks.get())
+                preview.dataframe(pd.concat(preview_rows, ignore_index=True).head(CUSTOM_PREVIEW_ROWS))
+            status.caption(f"Running… {time.perf_counter() - started:.1f}s")
+    finally:
+        if worker.is_alive():
+            cancel.set()
+            st.session_state["custom_query_cancelled"] = True
+        worker.join()
+
+    status.empty()
+    preview.empty()
+    if "error" in outcome:
+        record_query(query_record(query, total=time.perf_counter() - started, error=str(outcome["error"])))
+        raise outcome["error"]
+    result = outcome["result"]
+    record_query(query_record(query, execute=result.elapsed, total=time.perf_counter() - started,
+                              rows=result.rows, bytes=frame_bytes(result.frame), vm_steps=result.vm_steps))
+    summary = f"Returned {result.rows:,} rows in {result.elapsed:.2f}s"
+    if result.truncated:
+        return result.frame, "warning", f"{summary} — truncated by the {result.reason}."
+    cache.put(key, version, result.frame)
+    return result.frame, "caption", f"{summary}."
+
+# Function to run the custom query requested by the panel's Run button. It runs
+# in a full-script pass outside the fragment: a click on a widget inside a
+# fragment only queues a fragment rerun, which never stops a running script,
+# while the Cancel button here triggers a full rerun that does. The outcome is
+# kept for the panel, which shows it after the rerun that follows.
+def run_pending_custom_query():
+    signature = st.session_state.pop("custom_query_pending", None)
+    if signature is None:
+        return
+    query, time_budget, max_rows, max_mb = signature
+    st.session_state["active_panel"] = "custom"
+    try:
+        outcome = run_custom_query_guarded(query, time_budget, max_rows, max_mb * 1024 * 1024)
+    except Exception as e:
+        outcome = (None, "error", f"Error executing custom query: {e}")
+    st.session_state.setdefault("panel_memo", {})["custom_result"] = (signature, *outcome)
+    st.session_state["custom_query_recorded"] = st.session_state["panel_queries"].get("custom", 0)
+    st.rerun()
+
+# Function to show the query plan and the indexes a query uses
+def display_query_plan(query, params=None):
+    with get_pool().connection() as conn:
+        plan = explain(conn, query, params)
+    st.subheader("Query Plan:")
+    st.caption(f"Indexes used: {', '.join(indexes_used(plan)) or 'none (full scan)'}")
+    st.code("\n".join(plan), language='text')
+
+# Function to build a download file: the query is streamed from a pooled
+# connection in chunks, or the frame already in memory is written out
+def build_download(pool, fmt, query=None, params=None, frame=None):
+    if frame is not None:
+        buffer = export_frame(frame, fmt)
+    else:
+        with pool.connection() as conn:
+            buffer = export_cursor(conn.execute(query, params or ()), fmt)
+    with buffer:
+        return buffer.read()
+
+# Function to show CSV and Parquet download buttons for a result. The file is
+# only built when a button is clicked, on Streamlit's download thread.
+def display_downloads(name, query=None, params=None, frame=None, key=None):
+    key = key or output_name(name)
+    columns = st.columns(len(EXPORT_FORMATS))
+    for column, fmt in zip(columns, EXPORT_FORMATS):
+        column.download_button(f"Download {fmt.upper()}",
+                               partial(build_download, get_pool(), fmt, query, params, frame),
+                               file_name=f"{output_name(name)}.{fmt}", mime=EXPORT_MIME[fmt],
+                               key=f"download_{fmt}_{key}", on_click="ignore")
+
+# Function to check whether the engagement counter tables are installed
+def counters_ready():
+    with get_pool().connection() as conn:
+        return stats_available(conn)
+
+# Predefined queries, loaded once from SocialHub_queries.sql
+@st.cache_resource
+def get_catalog():
+    return load_catalog()
+
+# Function to show a sidebar input for each parameter of a catalog query
+def query_inputs(entry):
+    values = {}
+    for param in entry.params:
+        key = f"param_{entry.name}_{param.name}"
+        if isinstance(param.default, bool):
+            values[param.name] = st.sidebar.checkbox(param.label, value=param.default, key=key)
+        elif isinstance(param.default, int):
+            values[param.name] = int(st.sidebar.number_input(param.label, min_value=0, value=param.default, key=key))
+        elif isinstance(param.default, float):
+            values[param.name] = st.sidebar.slider(param.label, 0.0, 1.0, param.default, 0.05, key=key)
+        else:
+            values[param.name] = st.sidebar.text_input(param.label, value=param.default, key=key)
+    return values
+
+# Function to run and show a predefined SQL query with its parameters bound
+def display_predefined_query(title, query, params, show_info):
+    query_result = run_query(query, params)
+    st.subheader(f"{title}:")
+    st.code(query, language='sql')
+    if params:
+        st.caption("Parameters: " + ", ".join(f"{name} = {value}" for name, value in params.items()))
+    st.subheader("Query Result:")
+    st.dataframe(query_result)
+    display_downloads(title, query, params)
+    if show_info:
+        display_query_plan(query, params)
+
+# Function to answer a catalog query from its engine, the counter tables or SQL
+def display_catalog_query(entry, values, show_info, approximate=False):
+    if approximate and entry.name in APPROX_QUERIES:
+        display_approximate_query(entry.name, values, show_info)
+    elif entry.engine == "graph":
+        display_graph_query(entry.name, values, show_info)
+    elif entry.engine == "tags":
+        display_similar_photos(entry.name, values, show_info)
+    elif entry.name in STATS_QUERIES and counters_ready():
+        display_predefined_query(entry.name, STATS_QUERIES[entry.name], values, show_info)
+    else:
+        display_predefined_query(entry.name, entry.sql, values, show_info)
+
+# Tag similarity index over photo_tags, rebuilt whenever the database changes
+@st.cache_resource(max_entries=1)
+def get_tag_index(version):
+    return run_engine_step("build tag index", "build", TagIndex.from_connection,
+                           lambda index: (len(index.photo_tags), index.nbytes()))
+
+# Function to show photo pairs with similar tags from the tag similarity index
+def display_similar_photos(title, params, show_info):
+    index = get_tag_index(current_version())
+    query_result, method = run_engine_step(f"tag index: {title}", "execute",
+                                           lambda conn: answer_tag_query(index, conn, params), answer_size)
+    st.subheader(f"{title}:")
+    st.caption(method + ", computed from the inverted tag index.")
+    st.subheader("Query Result:")
+    st.dataframe(query_result)
+    display_downloads(title, frame=query_result)
+    if show_info:
+        st.caption(f"Tag index: {len(index.photo_ids):,} photos, {len(index.tag_ids):,} tags, "
+                   f"{len(index.photo_tags):,} postings, {index.nbytes() / 1024 / 1024:.1f} MB")
+
+# Sketches of likes and comments shared by every session; each use folds in
+# the rows appended since the previous one
+@st.cache_resource
+def get_engagement_sketches():
+    return EngagementSketches()
+
+# Function to answer a predefined query approximately from the sketches
+def display_approximate_query(title, params, show_info):
+    sketches = get_engagement_sketches()
+    added = run_engine_step("update engagement sketches", "build", sketches.update,
+                            lambda added: (added, sketches.nbytes()))
+    query_result, method = run_engine_step(f"engagement sketches: {title}", "execute",
+                                           lambda conn: answer_approx_query(sketches, conn, title, params),
+                                           answer_size)
+    st.subheader(f"{title}:")
+    st.caption(f"Fast approximate answer. {method}.")
+    st.subheader("Query Result:")
+    st.dataframe(query_result)
+    display_downloads(title, frame=query_result)
+    if show_info:
+        st.caption(f"Engagement sketches: {sketches.rows('likes'):,} likes, {sketches.rows('comments'):,} comments "
+                   f"({added:,} new rows folded in), {sketches.nbytes() / 1024 / 1024:.1f} MB")
+
+# Follows graph in CSR form, rebuilt whenever the database changes
+@st.cache_resource(max_entries=1)
+def get_follow_graph(version):
+    return run_engine_step("build follows graph", "build", FollowGraph.from_connection,
+                           lambda graph: (len(graph.out_targets), graph.nbytes()))
+
+# Function to answer a predefined follows query from the in-memory graph
+def display_graph_query(title, params, show_info):
+    graph = get_follow_graph(current_version())
+    query_result, method = run_engine_step(f"follows graph: {title}", "execute",
+                                           lambda conn: answer_graph_query(graph, conn, title, params), answer_size)
+    st.subheader(f"{title}:")
+    st.caption(method + ", computed from the in-memory follows graph.")
+    st.subheader("Query Result:")
+    st.dataframe(query_result)
+    display_downloads(title, frame=query_result)
+    if show_info:
+        st.caption(f"Follows graph: {len(graph.user_ids):,} users, {len(graph.out_targets):,} edges, "
+                   f"{graph.nbytes() / 1024 / 1024:.1f} MB")
+
+# Function to run a chosen set of predefined SQL queries at once, one panel per
+# query; each panel fills in as soon as its own query finishes
+def display_dashboard(catalog):
+    st.sidebar.subheader("Dashboard")
+    choices = [name for name, entry in catalog.items() if entry.sql and entry.engine is None]
+    selected = st.sidebar.multiselect("Dashboard queries", choices, default=choices[:DASHBOARD_DEFAULT_PANELS],
+                                      key="dashboard_queries")
+    time_budget = st.sidebar.number_input("Per-query time budget (s)", min_value=1.0, max_value=300.0,
+                                          value=DASHBOARD_TIME_BUDGET, key="dashboard_budget")
+    if not st.sidebar.button("Run Dashboard"):
+        return
+
+    use_counters = counters_ready()
+    cache = get_result_cache()
+    version = current_version()
+    columns = st.columns(DASHBOARD_COLUMNS)
+    panels = {}
+    pending = []
+    for position, name in enumerate(selected):
+        sql = STATS_QUERIES[name] if use_counters and name in STATS_QUERIES else catalog[name].sql
+        params = catalog[name].defaults()
+        panel = columns[position % DASHBOARD_COLUMNS].container()
+        panel.subheader(name)
+        body = panel.empty()
+        panels[name] = (body, sql, params)
+        cached = cache.get(cache_key(sql, params), version)
+        if cached is None:
+            body.caption("Running…")
+            pending.append((name, sql, params))
+            continue
+        record_query(query_record(sql, rows=len(cached), bytes=frame_bytes(cached), cache_hit=True))
+        with body.container():
+            st.caption(f"{len(cached):,} rows from cache")
+            st.dataframe(cached)
+            display_downloads(name, frame=cached)
+
+    started = time.perf_counter()
+    busy = 0.0
+    with closing(run_dashboard(get_pool(), pending, time_budget=time_budget)) as results:
+        for result in results:
+            body, sql, params = panels[result.name]
+            busy += result.elapsed
+            nbytes = frame_bytes(result.frame) if result.frame is not None else 0
+            record_query(query_record(sql, execute=result.elapsed, total=result.elapsed, rows=result.rows,
+                                      bytes=nbytes, vm_steps=result.vm_steps, error=result.error))
+            with body.container():
+                if result.error is not None:
+                    st.error(f"Query failed after {result.elapsed:.2f}s: {result.error}")
+                    continue
+                if result.truncated:
+                    st.warning(f"{result.rows:,} rows in {result.elapsed:.2f}s — truncated by the {result.reason}.")
+                else:
+                    st.caption(f"{result.rows:,} rows in {result.elapsed:.2f}s")
+                    cache.put(cache_key(sql, params), version, result.frame)
+                st.dataframe(result.frame)
+                display_downloads(result.name, frame=result.frame)
+    if pending:
+        st.caption(f"Dashboard finished in {time.perf_counter() - started:.2f}s; "
+                   f"its queries took {busy:.2f}s in total.")
+
 def display_introduction():
     st.sidebar.markdown("### Welcome to SocialHub Data Exploration")
     st.sidebar.markdown("Here's a quick guide to get you started:")
@@ -19,50 +504,117 @@ def display_introduction():
     st.sidebar.markdown("5. **ERD of Database**: Click the 'ERD of Database' button to view Entity-Relationship Diagram.")
     st.sidebar.markdown("Thank you for exploring!")
 
-# Function to get user input for interactive queries
-def interactive_query():
-    st.set_page_config(
-        page_title="SocialHub Data Exploration 📊",
-        layout="wide"
-    )
+# Function to show query timings, the pool and the result cache in the sidebar
+def display_performance_panel():
+    recorder = get_query_recorder()
+    records = recorder.records()
+    with st.sidebar.expander("Performance"):
+        if not records:
+            st.caption("No queries recorded yet.")
+        else:
+            summary = recorder.summary()
+            hits = int(summary["cache_hits"].sum())
+            col1, col2 = st.columns(2)
+            col1.metric("Queries", f"{len(records):,}")
+            col2.metric("Cache hit rate", f"{hits / max(int(summary['calls'].sum()), 1):.0%}")
+            last = records[-1]
+            if last.error is not None:
+                detail = f" — failed: {last.error}"
+            elif last.cache_hit:
+                detail = " (cache hit)"
+            else:
+                detail = (f" — connect {last.connect * 1000:.1f} · execute {last.execute * 1000:.1f} · "
+                          f"fetch {last.fetch * 1000:.1f} · build {last.build * 1000:.1f} ms, "
+                          f"~{last.vm_steps:,} VM steps")
+            st.caption(f"Last query: {last.total * 1000:.1f} ms, {last.rows:,} rows, {last.bytes / 1024:.0f} KB{detail}")
+            st.dataframe(summary[["fingerprint", "calls", "cache_hits", "mean_ms", "rows", "vm_steps", "query"]])
+            st.download_button("Export JSON lines", recorder.to_jsonl(), file_name="socialhub_queries.jsonl",
+                               mime="application/x-ndjson")
+            st.download_button("Export Prometheus metrics", recorder.to_prometheus(), file_name="socialhub_queries.prom",
+                               mime="text/plain")
+        pool_stats = get_pool().stats()
+        cache_stats = get_result_cache().stats()
+        st.caption(f"Pool: {pool_stats['in_use']}/{pool_stats['max_size']} in use, {pool_stats['waits']:,} waits · "
+                   f"Cache: {cache_stats['entries']:,} entries, {cache_stats['bytes'] / 1024 / 1024:.1f} MB")
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            snapshot_stats = snapshot.stats()
+            st.caption(f"Snapshot: {snapshot_stats['bytes'] / 1024 / 1024:.1f} MB in memory, "
+                       f"{snapshot_stats['age']:.0f}s old, built in {snapshot_stats['build_seconds']:.2f}s, "
+                       f"{snapshot_stats['refreshes']:,} refreshes")
+            if snapshot_stats["last_error"]:
+                st.warning(f"Snapshot refresh failed: {snapshot_stats['last_error']}")
+
+# Table browser panel. Like the other panels it is a fragment: its widgets
+# rerun only this function, and on full reruns its memoized results are shown
+# again without touching the database.
+@st.fragment
+def table_panel():
+    start_panel("tables")
 
-    st.title("SocialHub Data Exploration 📈")
-    st.header("Interactive Options")
-    
     # Display dropdown selection box for tables
-    table_names = run_query("SELECT name FROM sqlite_master WHERE type='table';")['name'].tolist()
+    table_names = session_memo("table_names", current_version(), lambda: run_query(
+        "SELECT name FROM sqlite_master WHERE type='table';")['name'].tolist())
     selected_table = st.selectbox("See Tables of Database:", table_names)
 
     # Checkbox to toggle visibility of the selected table
     toggle_checkbox = st.checkbox("Show Table")
 
-    # Show the selected table when it is chosen and the checkbox is selected
+    # Show the selected table one page at a time when the checkbox is selected
     if selected_table and toggle_checkbox:
-        query_result = run_query(f"SELECT * FROM {selected_table};")
-        st.subheader(f"{selected_table} Table")
-        st.dataframe(query_result)
+        browse_table(selected_table)
+    display_panel_queries("tables")
+
+# Custom query panel; the last result stays on screen until the query or its
+# limits change. Run hands the query to run_pending_custom_query.
+@st.fragment
+def custom_query_panel():
+    start_panel("custom")
+    st.session_state["panel_queries"]["custom"] = st.session_state.pop("custom_query_recorded", 0)
 
     # Input for custom query
     custom_query = st.text_area("Enter your SQL query:")
+    with st.expander("Custom query limits"):
+        limit_col1, limit_col2, limit_col3 = st.columns(3)
+        time_budget = limit_col1.number_input("Time budget (s)", min_value=1.0, max_value=300.0, value=CUSTOM_TIME_BUDGET)
+        max_rows = limit_col2.number_input("Row cap", min_value=1, max_value=10000000, value=CUSTOM_MAX_ROWS)
+        max_mb = limit_col3.number_input("Size cap (MB)", min_value=1, max_value=2048, value=CUSTOM_MAX_MB)
     run_custom_query = st.button("Run Custom Query 🔄")
 
+    if st.session_state.pop("custom_query_cancelled", False):
+        st.warning("Custom query cancelled.")
+
     # Display custom query result
+    signature = (custom_query, time_budget, int(max_rows), int(max_mb))
     if run_custom_query:
-        try:
-            query_result_custom = run_query(custom_query)
+        st.session_state["custom_query_pending"] = signature
+        st.rerun()
+    last = st.session_state.get("panel_memo", {}).get("custom_result")
+    if last is not None and last[0] == signature and "custom_query_pending" not in st.session_state:
+        _, query_result_custom, level, message = last
+        getattr(st, level)(message)
+        if query_result_custom is not None:
             st.write("Custom Query Result:")
             st.dataframe(query_result_custom)
-        except Exception as e:
-            st.error(f"Error executing custom query: {e}")
+            display_downloads("custom_query", frame=query_result_custom)
+    display_panel_queries("custom")
 
-    # Selection box to choose query type
-    selected_query_type = st.selectbox('Select a query type:', ['User Query', 'Photo Query'])
+# Entity-Relationship Diagram, read from disk once per process
+@st.cache_resource
+def get_erd_image():
+    with open(ERD_PATH, "rb") as f:
+        return f.read()
+
+# ERD panel
+@st.fragment
+def erd_panel():
+    start_panel("erd")
 
     # Button to show/hide database schema image
     show_schema_button = st.button("Click here to see ERD of Database")
 
     if show_schema_button:
-        st.image("0002.jpg", use_column_width=True, caption="Entity-Relationship Diagram")
+        st.image(get_erd_image(), use_column_width=True, caption="Entity-Relationship Diagram")
 
         # Checkbox to hide database schema image after viewing
         hide_schema_checkbox = st.checkbox("Hide ERD of Database", key="hide_schema")
@@ -70,371 +622,59 @@ def interactive_query():
         if hide_schema_checkbox:
             st.image("", caption="")  
             st.success("Database Schema Image Hidden!")
+    display_panel_queries("erd")
+
+# Function to get user input for interactive queries
+def interactive_query():
+    st.set_page_config(
+        page_title="SocialHub Data Exploration 📊",
+        layout="wide"
+    )
+
+    st.title("SocialHub Data Exploration 📈")
+    st.header("Interactive Options")
+
+    table_panel()
+    custom_query_panel()
+    run_pending_custom_query()
+
+    # Selection box to choose query type
+    catalog = get_catalog()
+    query_groups = categories(catalog)
+    selected_query_type = st.selectbox('Select a query type:', list(query_groups) + [DASHBOARD_VIEW])
+
+    erd_panel()
 
     # Display query results in the center of the main screen
     with st.container():
-        if selected_query_type == 'User Query':
-            st.sidebar.subheader("User Queries")
-            user_query_type = st.sidebar.selectbox('Select a query type:', ['Users with Most Followers', 'Top Users with Most Comments', 'Users who Have Liked Every Photo','Users Who Have Not Posted Photos','Top 5 users with the Highest Like-to-Comment Ratio','Users with less people following them than they follow','Users with Unique Tags',"User's Contribution to Tag Popularity",'Users Who Follow Each Other'])
-
-            if user_query_type:
-                st.sidebar.checkbox("Show Query Info", key=f"user_{user_query_type}")
-                run_user_query = st.sidebar.button("Run User Query")
-
-                if run_user_query:
-                    if user_query_type == 'Users with Most Followers':
-                        query_result_followers = run_query("SELECT f.followee_id, u.username, COUNT(*) AS followers_count FROM follows f JOIN users u ON f.followee_id = u.id GROUP BY f.followee_id, u.username HAVING followers_count = (SELECT MAX(followers_count) FROM (SELECT COUNT(*) AS followers_count FROM follows GROUP BY followee_id) AS max_followers);")
-                        st.subheader("Users with Most Followers:")
-                        
-                        query = """
-                SELECT f.followee_id, u.username, COUNT(*) AS followers_count
-                FROM follows f
-                JOIN users u ON f.followee_id = u.id
-                GROUP BY f.followee_id, u.username
-                HAVING followers_count = (
-                    SELECT MAX(followers_count)
-                    FROM (
-                        SELECT COUNT(*) AS followers_count
-                        FROM follows
-                        GROUP BY followee_id
-                    ) AS max_followers
-                );
-                """
-
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_followers)
-                        
-                    elif user_query_type == 'Top Users with Most Comments':
-                            query_result_comments = run_query("SELECT u.id, u.username, COUNT(c.id) AS comments_count FROM users u LEFT JOIN comments c ON u.id = c.user_id GROUP BY u.id, u.username HAVING comments_count = (SELECT MAX(comments_count) FROM (SELECT u.id, COUNT(c.id) AS comments_count FROM users u LEFT JOIN comments c ON u.id = c.user_id GROUP BY u.id) AS max_comments);")
-                            st.subheader("Top Users with Most Comments:")
-                        
-                            query = """
-                SELECT u.id, u.username, COUNT(c.id) AS comments_count
-                FROM users u
-                LEFT JOIN comments c ON u.id = c.user_id
-                GROUP BY u.id, u.username
-                HAVING comments_count = (
-                    SELECT MAX(comments_count)
-                    FROM (
-                        SELECT u.id, COUNT(c.id) AS comments_count
-                        FROM users u
-                        LEFT JOIN comments c ON u.id = c.user_id
-                        GROUP BY u.id
-                    ) AS max_comments
-                );
-            """
-                            st.code(query, language='sql')
-                            st.subheader("Query Result:")
-                     
-                            st.dataframe(query_result_comments)
-
-                    elif user_query_type == 'Users who Have Liked Every Photo':
-                        query_result_likes = run_query("SELECT dl.user_id, u.username FROM (SELECT DISTINCT user_id, photo_id FROM likes) AS dl JOIN users u ON dl.user_id = u.id GROUP BY dl.user_id, u.username HAVING COUNT(DISTINCT dl.photo_id) = (SELECT COUNT(DISTINCT id) FROM photos);")
-                        st.subheader("Users who Have Liked Every Photo:")
-                        
-                        query = """
-            SELECT dl.user_id, u.username
-            FROM (
-                SELECT DISTINCT user_id, photo_id
-                FROM likes
-            ) AS dl
-            JOIN users u ON dl.user_id = u.id
-            GROUP BY dl.user_id, u.username
-            HAVING COUNT(DISTINCT dl.photo_id) = (
-                SELECT COUNT(DISTINCT id)
-                FROM photos
-            );
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_likes)
-
-                    elif user_query_type == 'Users Who Have Not Posted Photos':
-                        query_result_photo = run_query("SELECT u.id, u.username FROM users u LEFT JOIN photos p ON u.id = p.user_id WHERE p.id IS NULL;")
-                        st.subheader("Users Who Have Not Posted Photos:")
-                        
-                        query = """
-            SELECT u.id, u.username
-            FROM users u
-            LEFT JOIN photos p ON u.id = p.user_id
-            WHERE p.id IS NULL;
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_photo)
-
-                    elif user_query_type == 'Top 5 users with the Highest Like-to-Comment Ratio':
-                        query_result_ltoc = run_query("SELECT u.id, u.username, COALESCE(SUM(l.likes_count) / NULLIF(CAST(SUM(c.comments_count) AS REAL), 0), 0) AS like_to_comment_ratio FROM users u LEFT JOIN (SELECT user_id, COUNT(*) AS likes_count FROM likes GROUP BY user_id) AS l ON u.id = l.user_id LEFT JOIN (SELECT user_id, COUNT(*) AS comments_count FROM comments GROUP BY user_id) AS c ON u.id = c.user_id GROUP BY u.id, u.username ORDER BY like_to_comment_ratio DESC LIMIT 5;")
-                        st.subheader("Top 5 users with the Highest Like-to-Comment Ratio:")
-                        
-                        query = """
-            SELECT u.id, u.username, COALESCE(SUM(l.likes_count) / NULLIF(CAST(SUM(c.comments_count) AS REAL), 0), 0) AS like_to_comment_ratio
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id, COUNT(*) AS likes_count
-                FROM likes
-                GROUP BY user_id
-            ) AS l ON u.id = l.user_id
-            LEFT JOIN (
-                SELECT user_id, COUNT(*) AS comments_count
-                FROM comments
-                GROUP BY user_id
-            ) AS c ON u.id = c.user_id
-            GROUP BY u.id, u.username
-            ORDER BY like_to_comment_ratio DESC
-            LIMIT 5;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_ltoc)
-
-                    elif user_query_type == 'Users with less people following them than they follow':
-                        query_result_ftf = run_query("SELECT u.id, u.username, COUNT(DISTINCT f.follower_id) AS followers_count, COUNT(DISTINCT f.followee_id) AS followees_count FROM users u LEFT JOIN follows f ON u.id = f.follower_id OR u.id = f.followee_id GROUP BY u.id, u.username HAVING followers_count > followees_count ORDER BY followers_count DESC;")
-                        st.subheader("Users with less people following them than they follow:")
-                        
-                        query = """
-            SELECT u.id, u.username, COUNT(DISTINCT f.follower_id) AS followers_count, COUNT(DISTINCT f.followee_id) AS followees_count
-            FROM users u
-            LEFT JOIN follows f ON u.id = f.follower_id OR u.id = f.followee_id
-            GROUP BY u.id, u.username
-            HAVING followers_count > followees_count
-            ORDER BY followers_count DESC;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_ftf)
-
-                    elif user_query_type == 'Users with Unique Tags':
-                        query_result_uwu = run_query("SELECT DISTINCT u.id, u.username FROM users u JOIN photos p ON u.id = p.user_id JOIN photo_tags pt ON p.id = pt.photo_id JOIN tags t ON pt.tag_id = t.id WHERE NOT EXISTS (SELECT 1 FROM photo_tags pt2 JOIN photos p2 ON pt2.photo_id = p2.id WHERE u.id != p2.user_id AND pt.tag_id = pt2.tag_id);")
-                        st.subheader("Users with Unique Tags:")
-                        
-                        query = """
-            SELECT DISTINCT u.id, u.username
-            FROM users u
-            JOIN photos p ON u.id = p.user_id
-            JOIN photo_tags pt ON p.id = pt.photo_id
-            JOIN tags t ON pt.tag_id = t.id
-            WHERE NOT EXISTS (
-                SELECT 1
-                FROM photo_tags pt2
-                JOIN photos p2 ON pt2.photo_id = p2.id
-                WHERE u.id != p2.user_id AND pt.tag_id = pt2.tag_id
-            );
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_uwu) 
-
-                    elif user_query_type == "User's Contribution to Tag Popularity":
-                        query_result_ctt = run_query("SELECT u.id, u.username, t.tag_name, COUNT(pt.photo_id) AS tag_contribution FROM users u JOIN photos p ON u.id = p.user_id JOIN photo_tags pt ON p.id = pt.photo_id JOIN tags t ON pt.tag_id = t.id GROUP BY u.id, u.username, t.tag_name ORDER BY tag_contribution DESC;")
-                        st.subheader("User's Contribution to Tag Popularity:")
-                        
-                        query = """
-            SELECT u.id, u.username, t.tag_name, COUNT(pt.photo_id) AS tag_contribution
-            FROM users u
-            JOIN photos p ON u.id = p.user_id
-            JOIN photo_tags pt ON p.id = pt.photo_id
-            JOIN tags t ON pt.tag_id = t.id
-            GROUP BY u.id, u.username, t.tag_name
-            ORDER BY tag_contribution DESC;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_ctt) 
-
-                    elif user_query_type == 'Users Who Follow Each Other':
-                        query_result_fee = run_query("SELECT f1.follower_id AS follower_id, u1.username AS follower_name, f1.followee_id AS followee_id, u2.username AS followee_name FROM follows f1 JOIN follows f2 ON f1.follower_id = f2.followee_id AND f1.followee_id = f2.follower_id JOIN users u1 ON f1.follower_id = u1.id JOIN users u2 ON f1.followee_id = u2.id WHERE f1.follower_id < f1.followee_id;")
-                        st.subheader("Users Who Follow Each Other:")
-                        
-                        query = """
-            SELECT f1.follower_id AS follower_id, u1.username AS follower_name, f1.followee_id AS followee_id, u2.username AS followee_name
-            FROM follows f1
-            JOIN follows f2 ON f1.follower_id = f2.followee_id AND f1.followee_id = f2.follower_id
-            JOIN users u1 ON f1.follower_id = u1.id
-            JOIN users u2 ON f1.followee_id = u2.id
-            WHERE f1.follower_id < f1.followee_id;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_fee)
-                        
-        elif selected_query_type == 'Photo Query':
-            st.sidebar.subheader("Photo Queries")
-            photo_query_type = st.sidebar.selectbox('Select a query type:', ['Photos with Rank and Like Counts', 'Photo with the Most Likes', 'Average Likes per Photo','Photos with No Likes','Photos Tagged with Multiple Tags','TOP 5 Photos with Highest Comments','Top 5 Photos with Most Engagement','Photos with Similar Tags'])
-
-                     
-            if photo_query_type:
-                st.sidebar.checkbox("Show Query Info", key=f"photo_{photo_query_type}")
-                run_photo_query = st.sidebar.button("Run Photo Query")
-
-                if run_photo_query:
-                    if photo_query_type == 'Photos with Rank and Like Counts':
-                        query_result_likes = run_query("WITH ranked_photos AS (SELECT photo_id, DENSE_RANK() OVER (ORDER BY COUNT(*) DESC) AS photo_rank, COUNT(*) AS likes_count FROM likes GROUP BY photo_id) SELECT photo_id, photo_rank, likes_count FROM ranked_photos WHERE photo_rank <= 5;")
-                        st.subheader("Photos with Rank and Like Counts:")
-                        
-                        query = """
-            WITH ranked_photos AS (
-                SELECT photo_id, DENSE_RANK() OVER (ORDER BY COUNT(*) DESC) AS photo_rank, COUNT(*) AS likes_count
-                FROM likes
-                GROUP BY photo_id
-            )
-            SELECT photo_id, photo_rank, likes_count
-            FROM ranked_photos
-            WHERE photo_rank <= 5;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_likes)
-                        
-                    elif photo_query_type == 'Photo with the Most Likes':
-                        query_result_ftm = run_query("SELECT l.photo_id, p.image_url, COUNT(*) AS likes_count FROM likes l JOIN photos p ON l.photo_id = p.id GROUP BY l.photo_id, p.image_url HAVING likes_count = (SELECT MAX(likes_count) FROM (SELECT COUNT(*) AS likes_count FROM likes GROUP BY photo_id) AS max_likes);")
-                        st.subheader("Photo with the Most Likes:")
-                        
-                        query = """
-            SELECT l.photo_id, p.image_url, COUNT(*) AS likes_count
-            FROM likes l
-            JOIN photos p ON l.photo_id = p.id
-            GROUP BY l.photo_id, p.image_url
-            HAVING likes_count = (
-                SELECT MAX(likes_count)
-                FROM (
-                    SELECT COUNT(*) AS likes_count
-                    FROM likes
-                    GROUP BY photo_id
-                ) AS max_likes
-            );
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_ftm)
-
-                    elif photo_query_type == 'Average Likes per Photo':
-                        query_result_alp = run_query("SELECT p.photo_id, ph.image_url, AVG(p.likes_count) AS avg_likes_per_photo FROM (SELECT l.photo_id, COUNT(*) AS likes_count FROM likes l GROUP BY l.photo_id) AS p JOIN photos ph ON p.photo_id = ph.id GROUP BY p.photo_id, ph.image_url;")
-                        st.subheader("Average Likes per Photo:")
-                        
-                        query = """
-            SELECT p.photo_id, ph.image_url, AVG(p.likes_count) AS avg_likes_per_photo
-            FROM (
-                SELECT l.photo_id, COUNT(*) AS likes_count
-                FROM likes l
-                GROUP BY l.photo_id
-            ) AS p
-            JOIN photos ph ON p.photo_id = ph.id
-            GROUP BY p.photo_id, ph.image_url;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_alp)
-
-                    elif photo_query_type == 'Photos with No Likes':
-                        query_result_fwn = run_query("SELECT p.id, p.image_url FROM photos p LEFT JOIN likes l ON p.id = l.photo_id WHERE l.user_id IS NULL;")
-                        st.subheader("Photos with No Likes:")
-                        
-                        query = """
-            SELECT p.id, p.image_url
-            FROM photos p
-            LEFT JOIN likes l ON p.id = l.photo_id
-            WHERE l.user_id IS NULL;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_fwn)  
-
-                    elif photo_query_type == 'Photos Tagged with Multiple Tags':
-                        query_result_fwm = run_query("SELECT p.id, p.image_url, COUNT(pt.tag_id) AS tags_count FROM photos p JOIN photo_tags pt ON p.id = pt.photo_id GROUP BY p.id HAVING tags_count > 4;")
-                        st.subheader("Photos Tagged with Multiple Tags:")
-                        
-                        query = """
-            SELECT p.id, p.image_url, COUNT(pt.tag_id) AS tags_count
-            FROM photos p
-            JOIN photo_tags pt ON p.id = pt.photo_id
-            GROUP BY p.id
-            HAVING tags_count > 4;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_fwm)   
-
-                    elif photo_query_type == 'TOP 5 Photos with Highest Comments':
-                        query_result_fmac = run_query("SELECT u.username, p.id AS photo_id, RANK() OVER (ORDER BY COUNT(c.id) DESC) AS photo_rank, COUNT(c.id) AS comments_count FROM photos p JOIN comments c ON p.id = c.photo_id JOIN users u ON p.user_id = u.id GROUP BY p.id, u.username LIMIT 5;")
-                        st.subheader("TOP 5 Photos with Highest Comments:")
-                        
-                        query = """
-            WITH ranked_photos AS (
-                SELECT u.username, p.id AS photo_id, RANK() OVER (ORDER BY COUNT(c.id) DESC) AS photo_rank, COUNT(c.id) AS comments_count
-                FROM photos p
-                JOIN comments c ON p.id = c.photo_id
-                JOIN users u ON p.user_id = u.id
-                GROUP BY p.id, u.username
-            )
-            SELECT username, photo_id, photo_rank, comments_count
-            FROM ranked_photos
-            WHERE photo_rank <= 5;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_fmac)    
-   
-
-                    elif photo_query_type == 'Top 5 Photos with Most Engagement':
-                        query_result_pme = run_query("SELECT p.id, p.image_url, (COALESCE(l.total_likes, 0) + COALESCE(c.total_comments, 0)) AS total_engagement FROM photos p LEFT JOIN (SELECT photo_id, COUNT(*) AS total_likes FROM likes GROUP BY photo_id) l ON p.id = l.photo_id LEFT JOIN (SELECT photo_id, COUNT(*) AS total_comments FROM comments GROUP BY photo_id) c ON p.id = c.photo_id ORDER BY total_engagement DESC LIMIT 5;")
-                        st.subheader("Top 5 Photos with Most Engagement(likes + comments):")
-                        
-                        query = """
-            SELECT p.id, p.image_url, (COALESCE(l.total_likes, 0) + COALESCE(c.total_comments, 0)) AS total_engagement
-            FROM photos p
-            LEFT JOIN (
-                SELECT photo_id, COUNT(*) AS total_likes
-                FROM likes
-                GROUP BY photo_id
-            ) l ON p.id = l.photo_id
-            LEFT JOIN (
-                SELECT photo_id, COUNT(*) AS total_comments
-                FROM comments
-                GROUP BY photo_id
-            ) c ON p.id = c.photo_id
-            ORDER BY total_engagement DESC
-            LIMIT 5;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_pme)
-
-                    elif photo_query_type == 'Photos with Similar Tags':
-                        query_result_pst = run_query("SELECT DISTINCT p1.id, p1.image_url, p2.id AS similar_photo_id, p2.image_url AS The_image_url FROM photos p1 JOIN photo_tags pt1 ON p1.id = pt1.photo_id JOIN photos p2 ON p1.id < p2.id JOIN photo_tags pt2 ON p2.id = pt2.photo_id AND pt1.tag_id = pt2.tag_id GROUP BY p1.id, p1.image_url, similar_photo_id, The_image_url HAVING COUNT(DISTINCT pt1.tag_id) >= 3;")
-                        st.subheader("Photos with Similar Tags:")
-                        
-                        query = """
-            SELECT DISTINCT p1.id, p1.image_url, p2.id AS similar_photo_id, p2.image_url AS The_image_url
-            FROM photos p1
-            JOIN photo_tags pt1 ON p1.id = pt1.photo_id
-            JOIN photos p2 ON p1.id < p2.id
-            JOIN photo_tags pt2 ON p2.id = pt2.photo_id AND pt1.tag_id = pt2.tag_id
-            GROUP BY p1.id, p1.image_url, similar_photo_id, The_image_url
-            HAVING COUNT(DISTINCT pt1.tag_id) >= 3;
-
-        """
-                        st.code(query, language='sql')
-                        st.subheader("Query Result:")
-                        st.dataframe(query_result_pst)
+        if selected_query_type == DASHBOARD_VIEW:
+            start_panel("dashboard")
+            display_dashboard(catalog)
+            return
+
+        st.sidebar.subheader(selected_query_type.replace("Query", "Queries"))
+        query_name = st.sidebar.selectbox('Select a query type:', query_groups[selected_query_type])
+
+        if query_name:
+            entry = catalog[query_name]
+            show_info = st.sidebar.checkbox("Show Query Info", key=f"info_{query_name}")
+            values = query_inputs(entry)
+            approximate = query_name in APPROX_QUERIES and st.sidebar.checkbox(
+                "Fast approximate", key=f"approx_{query_name}",
+                help="Answer from sketches of likes/comments instead of scanning them; error bounds are shown.")
+            run_catalog_query = st.sidebar.button(f"Run {selected_query_type}")
+
+            start_panel("catalog")
+            if run_catalog_query:
+                display_catalog_query(entry, values, show_info, approximate)
 
 # Main Streamlit app
 def main():
+    st.session_state["active_panel"] = None
+    st.session_state["panel_queries"] = {}
     interactive_query()
     display_introduction()
+    display_performance_panel()
     st.markdown(
         """<div style="position: fixed; bottom: 0; right: 0; padding: 10px;">
            Created with ❤️ by Darshan Panchal
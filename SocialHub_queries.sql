@@ -23,6 +23,9 @@ Instructions:
 1. The SQL queries in this script are designed to be run on the SocialHub database.
 2. Ensure that the database is properly set up before executing the queries.
 3. Customize and adapt the queries based on specific analysis requirements.
+4. Each query starts with a "#Query name" line followed by annotations the app reads as its query catalog:
+   "-- category:" (sidebar group), "-- param: name = default (label)" for every :name placeholder, and
+   "-- engine:" for queries the app answers from an in-memory engine (graph, tags) instead of SQL.
 
 Note:
 - The database file (SocialHub.db) is not included in this repository to protect sensitive data.
@@ -35,6 +38,7 @@ Feel free to reach out for any questions or feedback.
 -- [Start of SQL Queries]
 
 #Users with Most Followers
+-- category: User Query
 SELECT f.followee_id, u.username, COUNT(*) AS followers_count
 FROM follows f
 JOIN users u ON f.followee_id = u.id
@@ -49,6 +53,7 @@ HAVING followers_count = (
 );
                                       
 #Top Users with Most Comments:		
+-- category: User Query
 SELECT u.id, u.username, COUNT(c.id) AS comments_count
 FROM users u
 LEFT JOIN comments c ON u.id = c.user_id
@@ -64,6 +69,7 @@ HAVING comments_count = (
 );
            
 #Users who Have Liked Every Photo:                       
+-- category: User Query
 SELECT dl.user_id, u.username
 FROM (
 	SELECT DISTINCT user_id, photo_id
@@ -77,12 +83,15 @@ HAVING COUNT(DISTINCT dl.photo_id) = (
 );
 
 #Users Who Have Not Posted Photos:
+-- category: User Query
 SELECT u.id, u.username
 FROM users u
 LEFT JOIN photos p ON u.id = p.user_id
 WHERE p.id IS NULL;
 
 #Top 5 users with the Highest Like-to-Comment Ratio:					
+-- category: User Query
+-- param: top_n = 5 (Number of users)
 SELECT u.id, u.username, COALESCE(SUM(l.likes_count) / NULLIF(CAST(SUM(c.comments_count) AS REAL), 0), 0) AS like_to_comment_ratio
 FROM users u
 LEFT JOIN (
@@ -97,9 +106,11 @@ LEFT JOIN (
 ) AS c ON u.id = c.user_id
 GROUP BY u.id, u.username
 ORDER BY like_to_comment_ratio DESC
-LIMIT 5;
+LIMIT :top_n;
 
 #Users with less people following them than they follow:                       
+-- category: User Query
+-- engine: graph
 SELECT u.id, u.username, COUNT(DISTINCT f.follower_id) AS followers_count, COUNT(DISTINCT f.followee_id) AS followees_count
 FROM users u
 LEFT JOIN follows f ON u.id = f.follower_id OR u.id = f.followee_id
@@ -108,6 +119,7 @@ HAVING followers_count > followees_count
 ORDER BY followers_count DESC;
 
 #Users with Unique Tags:                       
+-- category: User Query
 SELECT DISTINCT u.id, u.username
 FROM users u
 JOIN photos p ON u.id = p.user_id
@@ -121,6 +133,7 @@ WHERE NOT EXISTS (
 );
 
 #User's Contribution to Tag Popularity:			
+-- category: User Query
 SELECT u.id, u.username, t.tag_name, COUNT(pt.photo_id) AS tag_contribution
 FROM users u
 JOIN photos p ON u.id = p.user_id
@@ -130,6 +143,8 @@ GROUP BY u.id, u.username, t.tag_name
 ORDER BY tag_contribution DESC;
 
 #Users Who Follow Each Other      
+-- category: User Query
+-- engine: graph
 SELECT f1.follower_id AS follower_id, u1.username AS follower_name, f1.followee_id AS followee_id, u2.username AS followee_name
 FROM follows f1
 JOIN follows f2 ON f1.follower_id = f2.followee_id AND f1.followee_id = f2.follower_id
@@ -137,7 +152,24 @@ JOIN users u1 ON f1.follower_id = u1.id
 JOIN users u2 ON f1.followee_id = u2.id
 WHERE f1.follower_id < f1.followee_id;
 
+#Users with Most Mutual Follows
+-- category: User Query
+-- engine: graph
+
+#2-Hop Reach of a User
+-- category: User Query
+-- engine: graph
+-- param: user_id = 1 (User id)
+
+#Common Followers of Two Users
+-- category: User Query
+-- engine: graph
+-- param: user_id = 1 (User id)
+-- param: other_user_id = 2 (Second user id)
+
 #Photos with Rank and Like Counts:				
+-- category: Photo Query
+-- param: top_n = 5 (Number of ranks)
 WITH ranked_photos AS (
 	SELECT photo_id, DENSE_RANK() OVER (ORDER BY COUNT(*) DESC) AS photo_rank, COUNT(*) AS likes_count
 	FROM likes
@@ -145,9 +177,10 @@ WITH ranked_photos AS (
 )
 SELECT photo_id, photo_rank, likes_count
 FROM ranked_photos
-WHERE photo_rank <= 5;
+WHERE photo_rank <= :top_n;
 
 #Photo with the Most Likes:
+-- category: Photo Query
 SELECT l.photo_id, p.image_url, COUNT(*) AS likes_count
 FROM likes l
 JOIN photos p ON l.photo_id = p.id
@@ -162,6 +195,7 @@ HAVING likes_count = (
 );
 
 #Average Likes per Photo:                        
+-- category: Photo Query
 SELECT p.photo_id, ph.image_url, AVG(p.likes_count) AS avg_likes_per_photo
 FROM (
 	SELECT l.photo_id, COUNT(*) AS likes_count
@@ -172,19 +206,24 @@ JOIN photos ph ON p.photo_id = ph.id
 GROUP BY p.photo_id, ph.image_url;
 
 #Photos with No Likes:					
+-- category: Photo Query
 SELECT p.id, p.image_url
 FROM photos p
 LEFT JOIN likes l ON p.id = l.photo_id
 WHERE l.user_id IS NULL;
 
 #Photos Tagged with Multiple Tags:
+-- category: Photo Query
+-- param: min_tags = 4 (More tags than)
 SELECT p.id, p.image_url, COUNT(pt.tag_id) AS tags_count
 FROM photos p
 JOIN photo_tags pt ON p.id = pt.photo_id
 GROUP BY p.id
-HAVING tags_count > 4;
+HAVING tags_count > :min_tags;
 
 #TOP 5 Photos with Highest Comments:                       
+-- category: Photo Query
+-- param: top_n = 5 (Number of ranks)
 WITH ranked_photos AS (
 	SELECT u.username, p.id AS photo_id, RANK() OVER (ORDER BY COUNT(c.id) DESC) AS photo_rank, COUNT(c.id) AS comments_count
 	FROM photos p
@@ -194,9 +233,11 @@ WITH ranked_photos AS (
 )
 SELECT username, photo_id, photo_rank, comments_count
 FROM ranked_photos
-WHERE photo_rank <= 5;
+WHERE photo_rank <= :top_n;
 
 #Top 5 Photos with Most Engagement:                      
+-- category: Photo Query
+-- param: top_n = 5 (Number of photos)
 SELECT p.id, p.image_url, (COALESCE(l.total_likes, 0) + COALESCE(c.total_comments, 0)) AS total_engagement
 FROM photos p
 LEFT JOIN (
@@ -210,15 +251,28 @@ LEFT JOIN (
 	GROUP BY photo_id
 ) c ON p.id = c.photo_id
 ORDER BY total_engagement DESC
-LIMIT 5;
+LIMIT :top_n;
 
 #Photos with Similar Tags:                       
+-- category: Photo Query
+-- engine: tags
+-- param: min_shared = 3 (Minimum shared tags)
+-- param: min_jaccard = 0.0 (Minimum Jaccard similarity)
+-- param: approximate = false (Approximate (MinHash/LSH))
 SELECT DISTINCT p1.id, p1.image_url, p2.id AS similar_photo_id, p2.image_url AS The_image_url
 FROM photos p1
 JOIN photo_tags pt1 ON p1.id = pt1.photo_id
 JOIN photos p2 ON p1.id < p2.id
 JOIN photo_tags pt2 ON p2.id = pt2.photo_id AND pt1.tag_id = pt2.tag_id
 GROUP BY p1.id, p1.image_url, similar_photo_id, The_image_url
-HAVING COUNT(DISTINCT pt1.tag_id) >= 3;
+HAVING COUNT(DISTINCT pt1.tag_id) >= :min_shared;
+
+#Photos Similar to a Photo
+-- category: Photo Query
+-- engine: tags
+-- param: photo_id = 1 (Photo id)
+-- param: top_k = 10 (Top k)
+-- param: min_shared = 3 (Minimum shared tags)
+-- param: min_jaccard = 0.0 (Minimum Jaccard similarity)
 
 -- [End of SQL Queries]
\ No newline at end of file
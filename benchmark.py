@@ -0,0 +1,160 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from datagen import generate
+from follow_graph import FollowGraph, answer_query as answer_graph_query
+from index_advisor import load_workload
+from query_catalog import load_catalog
+from tag_similarity import TagIndex, answer_query as answer_tag_query
+
+# Function to answer an engine-backed catalog query the way the app does
+def _engine_answer(conn, engine, name, params):
+    if engine == "graph":
+        frame, _ = answer_graph_query(FollowGraph.from_connection(conn), conn, name, params)
+    else:
+        frame, _ = answer_tag_query(TagIndex.from_connection(conn), conn, params)
+    return frame
+
+
+# Function to get this process's peak resident set size in MB. On Linux this
+# is VmHWM, which starts afresh at exec; ru_maxrss keeps the high-water mark of
+# the process that spawned it.
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Function to time one workload entry; runs in its own spawned process (a
+# forked child starts from the parent's resident memory, including the data
+# generator's heap) so the peak RSS it reports is that query's on top of a
+# fresh interpreter with this module's imports
+def _measure(db_path, kind, name, sql, params, repeat, results):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if kind == "sql":
+            rows = len(conn.execute(sql, params).fetchall())
+        else:
+            rows = len(_engine_answer(conn, kind, name, params))
+        timings.append(time.perf_counter() - started)
+    conn.close()
+    results.put({"timings": timings, "rows": rows, "peak_rss_mb": peak_rss_mb()})
+
+
+# Function to run one workload entry in a child process with a timeout
+def measure(db_path, kind, name, sql, params, repeat, timeout):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    child = context.Process(target=_measure, args=(db_path, kind, name, sql, params, repeat, results))
+    child.start()
+    child.join(timeout)
+    if child.is_alive():
+        child.terminate()
+        child.join()
+        return {"status": "timeout"}
+    if results.empty():
+        return {"status": "error", "exit_code": child.exitcode}
+    measured = results.get()
+    timings = np.array(measured["timings"]) * 1000
+    return {"status": "ok", "p50_ms": round(float(np.percentile(timings, 50)), 3),
+            "p95_ms": round(float(np.percentile(timings, 95)), 3), "peak_rss_mb": round(measured["peak_rss_mb"], 1),
+            "rows": measured["rows"]}
+
+
+# Function to list the benchmark workload: the catalog's SQL queries and its
+# engine-backed queries, each with its default parameters
+def benchmark_workload():
+    catalog = load_catalog()
+    workload = [("sql", name, source, sql, params) for name, source, sql, params in load_workload(catalog)]
+    workload += [(query.engine, query.name, "engine", None, query.defaults())
+                 for query in catalog.values() if query.engine]
+    return workload
+
+
+# Function to flag queries whose p95 latency grew by more than threshold times
+def compare(report, baseline, threshold):
+    previous = {(r["scale"], r["source"], r["name"]): r for r in baseline["results"] if r.get("status") == "ok"}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["scale"], result["source"], result["name"]))
+        if before is None:
+            continue
+        if result.get("status") != "ok":
+            regressions.append((result, before, None))
+        elif result["p95_ms"] > before["p95_ms"] * threshold:
+            regressions.append((result, before, result["p95_ms"] / max(before["p95_ms"], 1e-9)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SocialHub query workload on synthetic data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000], help="user counts to benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="data generator seed")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds allowed per query")
+    parser.add_argument("--data-dir", default="bench_data", help="where generated databases are kept")
+    parser.add_argument("--only", nargs="+", help="benchmark only these query names")
+    parser.add_argument("--out", default="benchmark_report.json", help="JSON report to write")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p95 slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    workload = benchmark_workload()
+    if args.only:
+        workload = [entry for entry in workload if entry[1] in args.only]
+
+    report = {
+        "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": args.seed, "repeat": args.repeat,
+                 "python": platform.python_version(), "sqlite": sqlite3.sqlite_version, "machine": platform.machine()},
+        "results": [],
+    }
+    for scale in args.scales:
+        db_path = os.path.join(args.data_dir, f"socialhub_{scale}_{args.seed}.db")
+        if not os.path.exists(db_path):
+            print(f"Generating {db_path} ...")
+            generate(db_path, scale, seed=args.seed)
+        for kind, name, source, sql, params in workload:
+            result = {"scale": scale, "name": name, "source": source}
+            result.update(measure(db_path, kind, name, sql, params, args.repeat, args.timeout))
+            report["results"].append(result)
+            if result["status"] == "ok":
+                print(f"{scale:>10,} {source:<22} {name[:55]:<55} p50 {result['p50_ms']:>10.1f} ms  "
+                      f"p95 {result['p95_ms']:>10.1f} ms  rss {result['peak_rss_mb']:>7.1f} MB  rows {result['rows']:,}")
+            else:
+                print(f"{scale:>10,} {source:<22} {name[:55]:<55} {result['status']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for result, before, ratio in regressions:
+            change = f"{ratio:.2f}x slower" if ratio is not None else result["status"]
+            print(f"REGRESSION {result['scale']:,} {result['source']} {result['name']}: {change}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
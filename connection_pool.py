@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Pragmas applied to every pooled connection. mmap_size is in bytes, a negative
+# cache_size is in KiB (here 64 MiB per connection) and temp_store keeps sorts
+# and temp B-trees in memory.
+DEFAULT_PRAGMAS = {
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Prepared statements each connection keeps, keyed by SQL text. Queries with
+# bound parameters keep the same text, so repeated runs skip parsing/planning.
+STATEMENT_CACHE_SIZE = 256
+
+
+# Function to build a read-only SQLite URI for a database file
+def read_only_uri(db_path):
+    return Path(db_path).resolve().as_uri() + "?mode=ro"
+
+
+# Bounded pool of long-lived read-only SQLite connections.
+# A thread checks out at most one connection at a time; nested checkouts on the
+# same thread get the connection it already holds. uri overrides the database
+# the connections open (for example an in-memory snapshot of db_path).
+class ConnectionPool:
+    def __init__(self, db_path, max_size=4, pragmas=None, timeout=30.0, statement_cache_size=STATEMENT_CACHE_SIZE,
+                 uri=None):
+        self.db_path = db_path
+        self.uri = uri or read_only_uri(db_path)
+        self.max_size = max_size
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self._idle = []
+        self._opened = 0
+        self._generation = 0
+        self._generations = {}
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "reused": 0,
+            "opened": 0,
+            "closed": 0,
+            "retargets": 0,
+        }
+
+    def _connect(self, uri):
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=self.timeout,
+                               cached_statements=self.statement_cache_size)
+        for name, value in self.pragmas.items():
+            if not str(name).isidentifier():
+                raise ValueError(f"Invalid pragma name: {name!r}")
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self):
+        with self._cond:
+            self._stats["checkouts"] += 1
+            if not self._idle and self._opened >= self.max_size:
+                self._stats["waits"] += 1
+                started = time.perf_counter()
+                ready = self._cond.wait_for(lambda: self._idle or self._opened < self.max_size, self.timeout)
+                self._stats["wait_seconds"] += time.perf_counter() - started
+                if not ready:
+                    raise TimeoutError(f"No SQLite connection available after {self.timeout}s")
+            if self._idle:
+                self._stats["reused"] += 1
+                return self._idle.pop()
+            self._opened += 1
+            self._stats["opened"] += 1
+            uri, generation = self.uri, self._generation
+        try:
+            conn = self._connect(uri)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._generations[conn] = generation
+        return conn
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            stale = self._generations[conn] != self._generation
+            if stale:
+                del self._generations[conn]
+                self._opened -= 1
+                self._stats["closed"] += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+        if stale:
+            conn.close()
+
+    # Point the pool at another database. Idle connections are closed now;
+    # connections in use finish on the old database and are closed on release.
+    def retarget(self, uri):
+        with self._cond:
+            self.uri = uri
+            self._generation += 1
+            self._stats["retargets"] += 1
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                del self._generations[conn]
+            self._opened -= len(idle)
+            self._stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    # Check out a connection for the current thread
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    # Close every idle connection
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                del self._generations[conn]
+            self._opened -= len(idle)
+            self._stats["closed"] += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["open"] = self._opened
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._opened - len(self._idle)
+            stats["max_size"] = self.max_size
+        return stats
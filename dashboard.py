@@ -0,0 +1,60 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import pandas as pd
+
+from safe_query import run_guarded
+
+# Seconds each dashboard query may run before it is stopped
+PANEL_TIME_BUDGET = 30.0
+
+# Row cap per dashboard panel
+PANEL_MAX_ROWS = 100000
+
+
+@dataclass
+class PanelResult:
+    name: str
+    frame: pd.DataFrame = None
+    rows: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False
+    reason: str = None
+    error: str = None
+    vm_steps: int = 0
+
+
+# Function to run one dashboard query on the worker thread's pooled connection
+def _run_panel(pool, name, sql, params, time_budget, max_rows, cancel_event):
+    started = time.perf_counter()
+    try:
+        with pool.connection() as conn:
+            result = run_guarded(conn, sql, params, time_budget=time_budget, max_rows=max_rows,
+                                 cancel_event=cancel_event)
+    except Exception as e:
+        return PanelResult(name, elapsed=time.perf_counter() - started, error=str(e))
+    return PanelResult(name, result.frame, result.rows, result.elapsed, result.truncated, result.reason,
+                       vm_steps=result.vm_steps)
+
+
+# Function to run several queries at once, yielding each PanelResult as soon as
+# its query finishes. queries is a list of (name, sql, params). Each worker
+# thread holds its own pooled connection, so at most pool.max_size queries run
+# together; every query gets its own time budget. Closing the generator early
+# (for example when the Streamlit script is stopped) cancels the rest.
+def run_dashboard(pool, queries, max_workers=None, time_budget=PANEL_TIME_BUDGET, max_rows=PANEL_MAX_ROWS):
+    if not queries:
+        return
+    cancel = threading.Event()
+    workers = min(max_workers or pool.max_size, pool.max_size, len(queries))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard")
+    try:
+        futures = [executor.submit(_run_panel, pool, name, sql, params, time_budget, max_rows, cancel)
+                   for name, sql, params in queries]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        cancel.set()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,169 @@
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(255) UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE photos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    image_url VARCHAR(255) NOT NULL,
+    user_id INTEGER NOT NULL,
+    created_dat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+CREATE TABLE comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    comment_text VARCHAR(255) NOT NULL,
+    user_id INTEGER NOT NULL,
+    photo_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (photo_id) REFERENCES photos(id)
+);
+CREATE TABLE likes (
+    user_id INTEGER NOT NULL,
+    photo_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (photo_id) REFERENCES photos(id),
+    PRIMARY KEY (user_id, photo_id)
+);
+CREATE TABLE follows (
+    follower_id INTEGER NOT NULL,
+    followee_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (follower_id) REFERENCES users(id),
+    FOREIGN KEY (followee_id) REFERENCES users(id),
+    PRIMARY KEY (follower_id, followee_id)
+);
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tag_name VARCHAR(255) UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE photo_tags (
+    photo_id INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL,
+    FOREIGN KEY (photo_id) REFERENCES photos(id),
+    FOREIGN KEY (tag_id) REFERENCES tags(id),
+    PRIMARY KEY (photo_id, tag_id)
+);
+"""
+
+# Rows per generated/inserted batch; bounds memory at any scale
+BATCH_SIZE = 500000
+
+# Average rows per user for each activity table
+DEFAULT_RATIOS = {"photos": 2.0, "likes": 10.0, "comments": 3.0, "follows": 15.0}
+
+# Zipf exponent of the popularity distributions; around 1 gives a few
+# celebrities with huge follower/like counts and a long tail with almost none
+SKEW = 1.1
+
+START = np.datetime64("2016-01-01T00:00:00")
+SPAN_SECONDS = 8 * 365 * 24 * 3600
+
+
+# Function to build a sampler over 1..n whose popularity follows a power law.
+# Ranks are shuffled so popular ids are spread over the id range.
+def power_law_sampler(rng, n, skew=SKEW):
+    weights = np.arange(1, n + 1, dtype=np.float64) ** -skew
+    rng.shuffle(weights)
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    return lambda size: np.minimum(np.searchsorted(cdf, rng.random(size)), n - 1) + 1
+
+
+def _timestamps(rng, size):
+    return (START + rng.integers(0, SPAN_SECONDS, size).astype("timedelta64[s]")).astype(str)
+
+
+def _batches(total):
+    for start in range(0, total, BATCH_SIZE):
+        yield start, min(BATCH_SIZE, total - start)
+
+
+# Function to write a seeded synthetic SocialHub database with `users` users
+def generate(db_path, users, seed=42, ratios=None, tags=200):
+    ratios = dict(DEFAULT_RATIOS, **(ratios or {}))
+    rng = np.random.default_rng(seed)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        for start, size in _batches(users):
+            ids = np.arange(start + 1, start + size + 1)
+            conn.executemany("INSERT INTO users (id, username, created_at) VALUES (?, ?, ?)",
+                             zip(ids.tolist(), [f"user_{i}" for i in ids.tolist()], _timestamps(rng, size).tolist()))
+
+        conn.executemany("INSERT INTO tags (id, tag_name, created_at) VALUES (?, ?, ?)",
+                         zip(range(1, tags + 1), [f"tag_{i}" for i in range(1, tags + 1)], _timestamps(rng, tags).tolist()))
+
+        photos = max(1, int(users * ratios["photos"]))
+        posters = power_law_sampler(rng, users)
+        for start, size in _batches(photos):
+            ids = np.arange(start + 1, start + size + 1)
+            conn.executemany("INSERT INTO photos (id, image_url, user_id, created_dat) VALUES (?, ?, ?, ?)",
+                             zip(ids.tolist(), [f"https://socialhub.example/photos/{i}.jpg" for i in ids.tolist()],
+                                 posters(size).tolist(), _timestamps(rng, size).tolist()))
+
+        # Active users like and comment more; popular photos attract more of both
+        actors = power_law_sampler(rng, users, skew=0.8)
+        popular_photos = power_law_sampler(rng, photos)
+        for start, size in _batches(int(users * ratios["likes"])):
+            conn.executemany("INSERT OR IGNORE INTO likes (user_id, photo_id, created_at) VALUES (?, ?, ?)",
+                             zip(actors(size).tolist(), popular_photos(size).tolist(), _timestamps(rng, size).tolist()))
+        for start, size in _batches(int(users * ratios["comments"])):
+            conn.executemany("INSERT INTO comments (comment_text, user_id, photo_id, created_at) VALUES (?, ?, ?, ?)",
+                             zip([f"comment {i}" for i in range(start, start + size)], actors(size).tolist(),
+                                 popular_photos(size).tolist(), _timestamps(rng, size).tolist()))
+
+        celebrities = power_law_sampler(rng, users)
+        for start, size in _batches(int(users * ratios["follows"])):
+            followers = actors(size)
+            followees = celebrities(size)
+            keep = followers != followees
+            conn.executemany("INSERT OR IGNORE INTO follows (follower_id, followee_id, created_at) VALUES (?, ?, ?)",
+                             zip(followers[keep].tolist(), followees[keep].tolist(),
+                                 _timestamps(rng, int(keep.sum())).tolist()))
+
+        # 1 to 8 tags per photo, drawn from a skewed tag popularity
+        tag_sampler = power_law_sampler(rng, tags)
+        for start, size in _batches(photos):
+            counts = rng.integers(1, 9, size)
+            photo_ids = np.repeat(np.arange(start + 1, start + size + 1), counts)
+            conn.executemany("INSERT OR IGNORE INTO photo_tags (photo_id, tag_id) VALUES (?, ?)",
+                             zip(photo_ids.tolist(), tag_sampler(len(photo_ids)).tolist()))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic SocialHub database.")
+    parser.add_argument("--users", type=int, default=10000, help="number of users (10k up to 10M)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed gives the same data")
+    parser.add_argument("--tags", type=int, default=200, help="number of tags")
+    parser.add_argument("--out", default="SocialHub.db", help="database file to write (overwritten)")
+    for table, ratio in DEFAULT_RATIOS.items():
+        parser.add_argument(f"--{table}-per-user", type=float, default=ratio, help=f"average {table} per user")
+    args = parser.parse_args()
+
+    ratios = {table: getattr(args, f"{table}_per_user") for table in DEFAULT_RATIOS}
+    generate(args.out, args.users, seed=args.seed, ratios=ratios, tags=args.tags)
+    print(f"Wrote {args.out} with {args.users:,} users.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+FETCH_SIZE = 100000
+
+# Count-Min shape: an estimate exceeds the true count by at most e / width of
+# the stream length, except with probability exp(-depth)
+CMS_WIDTH = 1 << 16
+CMS_DEPTH = 4
+
+# Keys with the largest estimates kept as top-k candidates per sketch
+HEAVY_HITTERS = 1000
+
+# HyperLogLog registers are 2 ** precision; the relative standard error is
+# 1.04 / sqrt(registers), 0.8% at 14
+HLL_PRECISION = 14
+
+# z for the 95% intervals shown with HyperLogLog estimates
+Z_95 = 1.96
+
+# Tables streamed into the sketches, read in rowid order so that later
+# updates only fetch rows appended since the last one
+SOURCES = {
+    "likes": "SELECT rowid, user_id, photo_id FROM likes WHERE rowid > ? ORDER BY rowid",
+    "comments": "SELECT rowid, user_id, photo_id FROM comments WHERE rowid > ? ORDER BY rowid",
+}
+
+MASK64 = (1 << 64) - 1
+
+
+# Function to hash integer keys to well-mixed 64-bit values (splitmix64);
+# seed selects an independent hash function
+def _hash(keys, seed=0):
+    z = np.asarray(keys, dtype=np.int64).astype(np.uint64)
+    z = z + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) & MASK64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+# HyperLogLog distinct counter over integer keys
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION, seed=0):
+        self.precision = precision
+        self.seed = seed
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, keys):
+        hashes = _hash(keys, self.seed)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        # Rank is the position of the lowest set bit of the remaining bits; a
+        # guard bit above them caps it at width + 1
+        rest = (hashes & np.uint64((1 << width) - 1)) | np.uint64(1 << width)
+        lowest = rest & (~rest + np.uint64(1))
+        rank = (np.log2(lowest.astype(np.float64)) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+
+# Count-Min sketch of integer keys: estimate() never undercounts, and
+# overcounts by at most error() with probability 1 - exp(-depth)
+class CountMinSketch:
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.width = width
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, keys):
+        return [(_hash(keys, row + 1) % np.uint64(self.width)).astype(np.intp) for row in range(len(self.table))]
+
+    def add(self, keys, counts):
+        for row, columns in zip(self.table, self._columns(keys)):
+            row += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(np.sum(counts))
+
+    def estimate(self, keys):
+        if len(keys) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.min([row[columns] for row, columns in zip(self.table, self._columns(keys))], axis=0)
+
+    def error(self):
+        return math.ceil(math.e / self.width * self.total)
+
+
+# Count-Min sketch plus the capacity keys with the largest estimates. A key
+# dropped from the candidates comes back as soon as it appears again, since
+# its estimate covers the whole stream.
+class HeavyHitters:
+    def __init__(self, capacity=HEAVY_HITTERS, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth)
+        self.keys = np.empty(0, dtype=np.int64)
+
+    def add(self, keys):
+        unique, counts = np.unique(keys, return_counts=True)
+        self.sketch.add(unique, counts)
+        candidates = np.union1d(self.keys, unique)
+        if len(candidates) > self.capacity:
+            estimates = self.sketch.estimate(candidates)
+            candidates = np.sort(candidates[np.argpartition(-estimates, self.capacity - 1)[:self.capacity]])
+        self.keys = candidates
+
+    # Function to get the candidates and their estimates, largest first
+    def top(self):
+        estimates = self.sketch.estimate(self.keys)
+        order = np.lexsort((self.keys, -estimates))
+        return self.keys[order], estimates[order]
+
+
+# Sketches of the likes and comments tables, built in one streaming pass over
+# each and kept current by folding in rows appended since the last update:
+# heavy-hitter sketches keyed by user and by photo, and a HyperLogLog count
+# of the distinct liked photos.
+class EngagementSketches:
+    def __init__(self, capacity=HEAVY_HITTERS, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.options = dict(capacity=capacity, width=width, depth=depth)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        capacity, width, depth = self.options["capacity"], self.options["width"], self.options["depth"]
+        self.last_rowid = {table: 0 for table in SOURCES}
+        self.row_counts = {table: 0 for table in SOURCES}
+        self.by_user = {table: HeavyHitters(capacity, width, depth) for table in SOURCES}
+        self.by_photo = {table: HeavyHitters(capacity, width, depth) for table in SOURCES}
+        self.engagement = HeavyHitters(capacity, width, depth)
+        self.liked_photos = HyperLogLog(seed=2)
+
+    @classmethod
+    def from_connection(cls, conn, **options):
+        sketches = cls(**options)
+        sketches.update(conn)
+        return sketches
+
+    def rows(self, table):
+        return self.row_counts[table]
+
+    def _add(self, table, chunk):
+        users, photos = chunk[:, 1], chunk[:, 2]
+        self.row_counts[table] += len(chunk)
+        self.by_user[table].add(users)
+        self.by_photo[table].add(photos)
+        self.engagement.add(photos)
+        if table == "likes":
+            self.liked_photos.add(photos)
+        self.last_rowid[table] = int(chunk[-1, 0])
+
+    # Function to fold in rows appended since the last update. If a table's
+    # largest rowid went down (rows deleted or the table rebuilt) everything is
+    # rebuilt; other deletes and updates are not seen until rebuild() is called.
+    # Returns the number of rows added.
+    def update(self, conn):
+        with self._lock:
+            for table in SOURCES:
+                (max_rowid,) = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()
+                if max_rowid < self.last_rowid[table]:
+                    self._reset()
+                    break
+            added = 0
+            for table, sql in SOURCES.items():
+                cursor = conn.execute(sql, (self.last_rowid[table],))
+                while True:
+                    rows = cursor.fetchmany(FETCH_SIZE)
+                    if not rows:
+                        break
+                    self._add(table, np.array(rows, dtype=np.int64))
+                    added += len(rows)
+            return added
+
+    def rebuild(self, conn):
+        with self._lock:
+            self._reset()
+        return self.update(conn)
+
+    def nbytes(self):
+        arrays = [self.liked_photos.registers]
+        for hitters in (*self.by_user.values(), *self.by_photo.values(), self.engagement):
+            arrays += [hitters.sketch.table, hitters.keys]
+        return sum(array.nbytes for array in arrays)
+
+
+# Function to look up a column for the ids of id_column with a query taking
+# an "IN (...)" list, adding it as name_column next to the ids
+def _with_lookup(conn, frame, sql, id_column, name_column):
+    ids = pd.unique(frame[id_column]).tolist()
+    values = []
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        values.extend(conn.execute(sql.format(placeholders=", ".join("?" * len(batch))), batch).fetchall())
+    values = pd.DataFrame(values, columns=[id_column, name_column])
+    frame = frame.merge(values, on=id_column, how="inner", sort=False)
+    columns = list(frame.columns)
+    columns.remove(name_column)
+    columns.insert(columns.index(id_column) + 1, name_column)
+    return frame[columns]
+
+
+USERNAMES = "SELECT id, username FROM users WHERE id IN ({placeholders})"
+IMAGE_URLS = "SELECT id, image_url FROM photos WHERE id IN ({placeholders})"
+PHOTO_OWNERS = ("SELECT p.id, u.username FROM photos p JOIN users u ON u.id = p.user_id "
+                "WHERE p.id IN ({placeholders})")
+
+
+def _bound_note(hitters, unit):
+    return (f"estimates are at most {hitters.sketch.error():,} {unit} above the true count "
+            f"(Count-Min, {1 - math.exp(-len(hitters.sketch.table)):.0%} confidence)")
+
+
+# Function to rank heavy hitters like the SQL window functions: dense (1, 2, 2,
+# 3) or competition (1, 2, 2, 4) ranking over the estimates
+def _ranked(hitters, key_column, count_column, dense=True):
+    keys, estimates = hitters.top()
+    frame = pd.DataFrame({key_column: keys, count_column: estimates})
+    frame["rank"] = frame[count_column].rank(method="dense" if dense else "min", ascending=False).astype(int)
+    frame[f"{count_column}_low"] = np.maximum(frame[count_column] - hitters.sketch.error(), 0)
+    return frame
+
+
+# Function to rank users by like-to-comment ratio from each user's Count-Min
+# estimates, over the heavy likers and commenters. Count-Min only overcounts,
+# by at most error() with its confidence, so the true counts lie in
+# [estimate - error, estimate]; a user whose comment count may be 0 has a
+# ratio of 0 in the exact query, so ratio_low is 0 for them.
+def _top_users_ratio(sketches, conn, top_n):
+    likes, comments = sketches.by_user["likes"].sketch, sketches.by_user["comments"].sketch
+    users = np.union1d(sketches.by_user["likes"].keys, sketches.by_user["comments"].keys)
+    likes_count, comments_count = likes.estimate(users), comments.estimate(users)
+    likes_low, comments_low = np.maximum(likes_count - likes.error(), 0), comments_count - comments.error()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frame = pd.DataFrame({
+            "id": users,
+            "like_to_comment_ratio": np.where(comments_count > 0, likes_count / comments_count, 0.0),
+            "ratio_low": np.where(comments_low > 0, likes_low / comments_count, 0.0),
+            "ratio_high": np.where(comments_count > 0, likes_count / np.maximum(comments_low, 1), 0.0),
+        })
+    frame = frame.sort_values(["like_to_comment_ratio", "id"], ascending=[False, True]).head(top_n)
+    method = (f"Count-Min estimates for the heavy likers and commenters; ratio_low/ratio_high bound the ratio, "
+              f"where {_bound_note(sketches.by_user['likes'], 'likes')} and at most {comments.error():,} comments")
+    return _with_lookup(conn, frame, USERNAMES, "id", "username"), method
+
+
+def _liked_every_photo(sketches, conn):
+    (photos,) = conn.execute("SELECT COUNT(*) FROM photos").fetchone()
+    counter = sketches.liked_photos
+    liked, error = counter.count(), counter.relative_error() * Z_95
+    keys, estimates = sketches.by_user["likes"].top()
+    # likes has one row per (user, photo), so a user's like count is the number
+    # of distinct photos they liked; Count-Min never undercounts, so no user
+    # who liked every photo is missed
+    frame = pd.DataFrame({"user_id": keys, "likes_count": estimates})
+    if photos == 0 or liked * (1 + error) < photos:
+        frame = frame.iloc[:0]
+    else:
+        frame = frame[frame["likes_count"] >= photos]
+    method = (f"Liked photos ≈ {liked:,.0f} ± {liked * error:,.0f} of {photos:,} (HyperLogLog, 95%); users whose "
+              f"like count reaches the photo count, where {_bound_note(sketches.by_user['likes'], 'likes')}")
+    return _with_lookup(conn, frame, USERNAMES, "user_id", "username"), method
+
+
+# Function to answer a predefined query approximately from the sketches.
+# Returns (frame, description of how it was computed and its error bounds).
+def answer_query(sketches, conn, name, params=None):
+    params = params or {}
+    top_n = params.get("top_n", 5)
+    with sketches._lock:
+        if name == 'Users who Have Liked Every Photo':
+            return _liked_every_photo(sketches, conn)
+        if name == 'Top 5 users with the Highest Like-to-Comment Ratio':
+            return _top_users_ratio(sketches, conn, top_n)
+        if name == 'Photos with Rank and Like Counts':
+            hitters = sketches.by_photo["likes"]
+            frame = _ranked(hitters, "photo_id", "likes_count").rename(columns={"rank": "photo_rank"})
+            frame = frame[frame["photo_rank"] <= top_n][["photo_id", "photo_rank", "likes_count", "likes_count_low"]]
+            return frame, f"Heavy-hitter photos by likes; {_bound_note(hitters, 'likes')}"
+        if name == 'Photo with the Most Likes':
+            hitters = sketches.by_photo["likes"]
+            frame = _ranked(hitters, "photo_id", "likes_count")
+            frame = frame[frame["rank"] == 1].drop(columns="rank")
+            return (_with_lookup(conn, frame, IMAGE_URLS, "photo_id", "image_url"),
+                    f"Heaviest photo by likes; {_bound_note(hitters, 'likes')}")
+        if name == 'Top Users with Most Comments':
+            hitters = sketches.by_user["comments"]
+            frame = _ranked(hitters, "id", "comments_count")
+            frame = frame[frame["rank"] == 1].drop(columns="rank")
+            return (_with_lookup(conn, frame, USERNAMES, "id", "username"),
+                    f"Heaviest commenter; {_bound_note(hitters, 'comments')}")
+        if name == 'TOP 5 Photos with Highest Comments':
+            hitters = sketches.by_photo["comments"]
+            frame = _ranked(hitters, "photo_id", "comments_count", dense=False).rename(columns={"rank": "photo_rank"})
+            frame = frame[frame["photo_rank"] <= top_n]
+            frame = _with_lookup(conn, frame, PHOTO_OWNERS, "photo_id", "username")
+            return (frame[["username", "photo_id", "photo_rank", "comments_count", "comments_count_low"]],
+                    f"Heavy-hitter photos by comments; {_bound_note(hitters, 'comments')}")
+        if name == 'Top 5 Photos with Most Engagement':
+            hitters = sketches.engagement
+            frame = _ranked(hitters, "id", "total_engagement").drop(columns="rank").head(top_n)
+            return (_with_lookup(conn, frame, IMAGE_URLS, "id", "image_url"),
+                    f"Heavy-hitter photos by likes plus comments; {_bound_note(hitters, 'likes and comments')}")
+    raise ValueError(f"The engagement sketches cannot answer {name!r}")
+
+
+# Predefined queries answer_query can estimate
+APPROX_QUERIES = (
+    'Users who Have Liked Every Photo',
+    'Top 5 users with the Highest Like-to-Comment Ratio',
+    'Photos with Rank and Like Counts',
+    'Photo with the Most Likes',
+    'Top Users with Most Comments',
+    'TOP 5 Photos with Highest Comments',
+    'Top 5 Photos with Most Engagement',
+)
@@ -0,0 +1,214 @@
+import argparse
+import sqlite3
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY,
+    followers_count INTEGER NOT NULL DEFAULT 0,
+    followees_count INTEGER NOT NULL DEFAULT 0,
+    photos_count INTEGER NOT NULL DEFAULT 0,
+    likes_given INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS photo_stats (
+    photo_id INTEGER PRIMARY KEY,
+    likes_count INTEGER NOT NULL DEFAULT 0,
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    tags_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_user_stats_followers ON user_stats (followers_count);
+CREATE INDEX IF NOT EXISTS idx_user_stats_comments ON user_stats (comments_count);
+CREATE INDEX IF NOT EXISTS idx_photo_stats_likes ON photo_stats (likes_count);
+CREATE INDEX IF NOT EXISTS idx_photo_stats_comments ON photo_stats (comments_count);
+CREATE INDEX IF NOT EXISTS idx_photo_stats_tags ON photo_stats (tags_count);
+CREATE INDEX IF NOT EXISTS idx_photo_stats_engagement ON photo_stats ((likes_count + comments_count));
+"""
+
+# Which counter each source table maintains:
+# source table -> [(stats table, stats key, source column, counter column)]
+COUNTERS = {
+    "photos": [("user_stats", "user_id", "user_id", "photos_count")],
+    "likes": [("user_stats", "user_id", "user_id", "likes_given"),
+              ("photo_stats", "photo_id", "photo_id", "likes_count")],
+    "comments": [("user_stats", "user_id", "user_id", "comments_count"),
+                 ("photo_stats", "photo_id", "photo_id", "comments_count")],
+    "follows": [("user_stats", "user_id", "followee_id", "followers_count"),
+                ("user_stats", "user_id", "follower_id", "followees_count")],
+    "photo_tags": [("photo_stats", "photo_id", "photo_id", "tags_count")],
+}
+
+# Every user and photo gets a stats row, so zero counts are represented too
+ENTITIES = {"users": ("user_stats", "user_id"), "photos": ("photo_stats", "photo_id")}
+
+STATS_TABLES = ("user_stats", "photo_stats")
+
+# Predefined queries answered from the counter tables instead of aggregating
+# likes/comments/follows/photo_tags; they take the same parameters as the
+# catalog queries they replace
+STATS_QUERIES = {
+    'Users with Most Followers': """
+SELECT s.user_id AS followee_id, u.username, s.followers_count
+FROM user_stats s
+JOIN users u ON u.id = s.user_id
+WHERE s.followers_count > 0
+  AND s.followers_count = (SELECT MAX(followers_count) FROM user_stats);
+""",
+    'Top Users with Most Comments': """
+SELECT s.user_id AS id, u.username, s.comments_count
+FROM user_stats s
+JOIN users u ON u.id = s.user_id
+WHERE s.comments_count = (SELECT MAX(comments_count) FROM user_stats);
+""",
+    'Top 5 users with the Highest Like-to-Comment Ratio': """
+SELECT s.user_id AS id, u.username, COALESCE(s.likes_given / NULLIF(CAST(s.comments_count AS REAL), 0), 0) AS like_to_comment_ratio
+FROM user_stats s
+JOIN users u ON u.id = s.user_id
+ORDER BY like_to_comment_ratio DESC
+LIMIT :top_n;
+""",
+    'Photos with Rank and Like Counts': """
+WITH top_counts AS (
+    SELECT DISTINCT likes_count
+    FROM photo_stats
+    WHERE likes_count > 0
+    ORDER BY likes_count DESC
+    LIMIT :top_n
+)
+SELECT photo_id, DENSE_RANK() OVER (ORDER BY likes_count DESC) AS photo_rank, likes_count
+FROM photo_stats
+WHERE likes_count >= (SELECT MIN(likes_count) FROM top_counts);
+""",
+    'Photo with the Most Likes': """
+SELECT s.photo_id, p.image_url, s.likes_count
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+WHERE s.likes_count > 0
+  AND s.likes_count = (SELECT MAX(likes_count) FROM photo_stats);
+""",
+    'Average Likes per Photo': """
+SELECT s.photo_id, p.image_url, CAST(s.likes_count AS REAL) AS avg_likes_per_photo
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+WHERE s.likes_count > 0;
+""",
+    'Photos with No Likes': """
+SELECT s.photo_id AS id, p.image_url
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+WHERE s.likes_count = 0;
+""",
+    'Photos Tagged with Multiple Tags': """
+SELECT s.photo_id AS id, p.image_url, s.tags_count
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+WHERE s.tags_count > :min_tags;
+""",
+    'TOP 5 Photos with Highest Comments': """
+SELECT u.username, s.photo_id, RANK() OVER (ORDER BY s.comments_count DESC) AS photo_rank, s.comments_count
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+JOIN users u ON u.id = p.user_id
+WHERE s.comments_count > 0
+  AND s.comments_count >= (SELECT MIN(comments_count)
+                           FROM (SELECT comments_count FROM photo_stats ORDER BY comments_count DESC LIMIT :top_n));
+""",
+    'Top 5 Photos with Most Engagement': """
+SELECT s.photo_id AS id, p.image_url, s.likes_count + s.comments_count AS total_engagement
+FROM photo_stats s
+JOIN photos p ON p.id = s.photo_id
+ORDER BY s.likes_count + s.comments_count DESC
+LIMIT :top_n;
+""",
+}
+
+
+def _bump(stats_table, key, value, counter, delta):
+    return (f"INSERT INTO {stats_table} ({key}, {counter}) VALUES ({value}, {delta}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {counter} = {counter} + ({delta});")
+
+
+# Function to build the trigger DDL that keeps the counter tables current
+def trigger_statements():
+    statements = []
+    for table, (stats_table, key) in ENTITIES.items():
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_insert AFTER INSERT ON {table} BEGIN "
+                          f"INSERT OR IGNORE INTO {stats_table} ({key}) VALUES (NEW.id); END;")
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_delete AFTER DELETE ON {table} BEGIN "
+                          f"DELETE FROM {stats_table} WHERE {key} = OLD.id; END;")
+    for table, counters in COUNTERS.items():
+        inserts = " ".join(_bump(s, k, f"NEW.{c}", n, 1) for s, k, c, n in counters)
+        deletes = " ".join(_bump(s, k, f"OLD.{c}", n, -1) for s, k, c, n in counters)
+        columns = ", ".join(sorted({c for _, _, c, _ in counters}))
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_count_insert AFTER INSERT ON {table} "
+                          f"BEGIN {inserts} END;")
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_count_delete AFTER DELETE ON {table} "
+                          f"BEGIN {deletes} END;")
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS stats_{table}_count_update AFTER UPDATE OF {columns} "
+                          f"ON {table} BEGIN {deletes} {inserts} END;")
+    return statements
+
+
+# Function to recompute every counter from the base tables
+def backfill(conn):
+    for stats_table in STATS_TABLES:
+        conn.execute(f"DELETE FROM {stats_table}")
+    for table, (stats_table, key) in ENTITIES.items():
+        conn.execute(f"INSERT INTO {stats_table} ({key}) SELECT id FROM {table}")
+    for table, counters in COUNTERS.items():
+        for stats_table, key, column, counter in counters:
+            # WHERE true keeps SQLite from parsing ON CONFLICT as a join constraint
+            conn.execute(f"INSERT INTO {stats_table} ({key}, {counter}) "
+                         f"SELECT {column}, COUNT(*) FROM {table} WHERE true GROUP BY {column} "
+                         f"ON CONFLICT({key}) DO UPDATE SET {counter} = excluded.{counter}")
+
+
+# Function to create the counter tables and triggers and fill them in one go
+def install(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.executescript("BEGIN;" + STATS_SCHEMA + "\n".join(trigger_statements()) + "COMMIT;")
+        with conn:
+            backfill(conn)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+# Function to remove the counter tables and their triggers
+def uninstall(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'stats\\_%' ESCAPE '\\'").fetchall()
+            for (name,) in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for stats_table in STATS_TABLES:
+                conn.execute(f"DROP TABLE IF EXISTS {stats_table}")
+    finally:
+        conn.close()
+
+
+# Function to check whether the counter tables are installed
+def stats_available(conn):
+    found = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                         STATS_TABLES).fetchone()[0]
+    return found == len(STATS_TABLES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the SocialHub engagement counter tables.")
+    parser.add_argument("--db", default="SocialHub.db", help="path to the SQLite database")
+    parser.add_argument("--drop", action="store_true", help="remove the counter tables and triggers")
+    args = parser.parse_args()
+
+    if args.drop:
+        uninstall(args.db)
+        print("Removed engagement counters.")
+    else:
+        install(args.db)
+        print("Engagement counters installed and backfilled.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+FETCH_SIZE = 100000
+
+
+# In-memory follows graph: forward (follower -> followees) and reverse
+# (followee -> followers) adjacency in CSR form over dense int32 node numbers
+class FollowGraph:
+    def __init__(self, followers, followees):
+        edges = np.unique(np.stack([np.asarray(followers, dtype=np.int64), np.asarray(followees, dtype=np.int64)]), axis=1)
+        self.user_ids, nodes = np.unique(edges.ravel(), return_inverse=True)
+        nodes = nodes.reshape(edges.shape).astype(np.int32)
+        sources, targets = nodes
+        n = len(self.user_ids)
+
+        # edges are sorted by follower, then followee, so the forward CSR needs no sort
+        self.out_indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=n))))
+        self.out_targets = targets
+        order = np.lexsort((sources, targets))
+        self.in_indptr = np.concatenate(([0], np.cumsum(np.bincount(targets, minlength=n))))
+        self.in_sources = sources[order]
+        self.out_degree = np.diff(self.out_indptr).astype(np.int32)
+        self.in_degree = np.diff(self.in_indptr).astype(np.int32)
+        self._sources = sources
+
+    @classmethod
+    def from_connection(cls, conn):
+        cursor = conn.execute("SELECT follower_id, followee_id FROM follows")
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64))
+        edges = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.int64)
+        return cls(edges[:, 0], edges[:, 1])
+
+    def nbytes(self):
+        arrays = (self.user_ids, self.out_indptr, self.out_targets, self.in_indptr, self.in_sources,
+                  self.out_degree, self.in_degree, self._sources)
+        return sum(array.nbytes for array in arrays)
+
+    def _node(self, user_id):
+        position = np.searchsorted(self.user_ids, user_id)
+        if position == len(self.user_ids) or self.user_ids[position] != user_id:
+            return None
+        return position
+
+    # Function to flag, for every edge, whether the followee follows back
+    def _reciprocal_mask(self):
+        n = len(self.user_ids)
+        keys = self._sources.astype(np.int64) * n + self.out_targets
+        reverse = self.out_targets.astype(np.int64) * n + self._sources
+        positions = np.minimum(np.searchsorted(keys, reverse), len(keys) - 1)
+        return keys[positions] == reverse if len(keys) else np.zeros(0, dtype=bool)
+
+    # Function to list every pair of users following each other, once per pair
+    def reciprocal_pairs(self):
+        mask = self._reciprocal_mask() & (self._sources < self.out_targets)
+        return pd.DataFrame({"follower_id": self.user_ids[self._sources[mask]],
+                             "followee_id": self.user_ids[self.out_targets[mask]]})
+
+    # Function to count each user's followers and followees, keeping users for
+    # whom compare(followers, followees) holds
+    def degree_imbalance(self, compare=np.greater):
+        keep = compare(self.in_degree, self.out_degree)
+        frame = pd.DataFrame({"id": self.user_ids[keep], "followers_count": self.in_degree[keep],
+                              "followees_count": self.out_degree[keep]})
+        return frame.sort_values(["followers_count", "id"], ascending=[False, True], ignore_index=True)
+
+    # Function to count, per user, the people they follow who follow them back
+    def mutual_follow_counts(self):
+        counts = np.bincount(self._sources[self._reciprocal_mask()], minlength=len(self.user_ids))
+        frame = pd.DataFrame({"id": self.user_ids, "mutual_follows": counts, "followers_count": self.in_degree,
+                              "followees_count": self.out_degree})
+        frame = frame[frame["mutual_follows"] > 0]
+        return frame.sort_values(["mutual_follows", "id"], ascending=[False, True], ignore_index=True)
+
+    # Function to find the users two follows away from a user (not followed
+    # directly), with how many of the user's followees lead to each of them
+    def two_hop_reach(self, user_id):
+        node = self._node(user_id)
+        if node is None:
+            return pd.DataFrame(columns=["id", "paths"])
+        first = self.out_targets[self.out_indptr[node]:self.out_indptr[node + 1]]
+        starts = self.out_indptr[first]
+        lengths = self.out_indptr[first + 1] - starts
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        second = self.out_targets[offsets + np.arange(int(lengths.sum()))]
+        second = second[(second != node) & ~np.isin(second, first)]
+        reached, paths = np.unique(second, return_counts=True)
+        frame = pd.DataFrame({"id": self.user_ids[reached], "paths": paths})
+        return frame.sort_values(["paths", "id"], ascending=[False, True], ignore_index=True)
+
+    # Function to list the followers two users have in common
+    def common_followers(self, user_a, user_b):
+        a, b = self._node(user_a), self._node(user_b)
+        if a is None or b is None:
+            return pd.DataFrame(columns=["id"])
+        common = np.intersect1d(self.in_sources[self.in_indptr[a]:self.in_indptr[a + 1]],
+                                self.in_sources[self.in_indptr[b]:self.in_indptr[b + 1]])
+        return pd.DataFrame({"id": self.user_ids[common]})
+
+
+# Function to add the username of the user in id_column as name_column
+def with_usernames(conn, frame, id_column="id", name_column="username"):
+    ids = pd.unique(frame[id_column]).tolist()
+    names = []
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        placeholders = ", ".join("?" * len(batch))
+        names.extend(conn.execute(f"SELECT id, username FROM users WHERE id IN ({placeholders})", batch).fetchall())
+    names = pd.DataFrame(names, columns=[id_column, name_column])
+    frame = frame.merge(names, on=id_column, how="inner", sort=False)
+    columns = list(frame.columns)
+    columns.remove(name_column)
+    columns.insert(columns.index(id_column) + 1, name_column)
+    return frame[columns]
+
+
+# Function to answer a graph-backed catalog query by name, with usernames
+# added. Returns (frame, description of how it was computed).
+def answer_query(graph, conn, name, params=None):
+    params = params or {}
+    if name == 'Users Who Follow Each Other':
+        frame = with_usernames(conn, graph.reciprocal_pairs(), 'follower_id', 'follower_name')
+        return (with_usernames(conn, frame, 'followee_id', 'followee_name'),
+                "Follows whose reverse edge also exists in the graph")
+    if name == 'Users with less people following them than they follow':
+        return (with_usernames(conn, graph.degree_imbalance()),
+                "Users whose in-degree (followers) is greater than their out-degree (followees)")
+    if name == 'Users with Most Mutual Follows':
+        return with_usernames(conn, graph.mutual_follow_counts()), "Number of followees who follow each user back"
+    user_a = params.get("user_id")
+    if name == '2-Hop Reach of a User':
+        return (with_usernames(conn, graph.two_hop_reach(user_a)),
+                f"Users followed by someone user {user_a} follows, but not by user {user_a} directly")
+    if name == 'Common Followers of Two Users':
+        user_b = params.get("other_user_id")
+        return (with_usernames(conn, graph.common_followers(user_a, user_b)),
+                f"Users following both user {user_a} and user {user_b}")
+    raise ValueError(f"The follows graph cannot answer {name!r}")
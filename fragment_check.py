@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SocialHub.py")
+
+
+# Function to read the panels of the queries logged since the last call
+def _new_panels(log_path, seen):
+    with open(log_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [record["panel"] for record in records[seen:]], len(records)
+
+
+# Function to find the first button whose label starts with prefix
+def _button(buttons, prefix):
+    return next(button for button in buttons if button.label.startswith(prefix))
+
+
+# Function to drive the app through interactions that each belong to one
+# panel and check that the queries they record all come from that panel (or
+# none at all, for interactions that only change widgets), and that every
+# fragment shows its own query count. Returns the list of failures.
+def check(timeout=60):
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "queries.jsonl")
+        open(log_path, "w").close()
+        os.environ["SOCIALHUB_QUERY_LOG"] = log_path
+        app = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+        _, seen = _new_panels(log_path, 0)
+        steps = [
+            ("show table", "tables", lambda: app.checkbox[0].check().run()),
+            ("next page", "tables", lambda: _button(app.button, "Next").click().run()),
+            ("type custom query", None, lambda: app.text_area[0].input("SELECT * FROM users").run()),
+            ("run custom query", "custom", lambda: _button(app.button, "Run Custom").click().run()),
+            ("show ERD", None, lambda: _button(app.button, "Click here").click().run()),
+            ("run catalog query", "catalog", lambda: app.sidebar.button[0].click().run()),
+        ]
+        for label, panel, action in steps:
+            action()
+            if app.exception:
+                failures.append(f"{label}: {app.exception[0].message}")
+                continue
+            panels, seen = _new_panels(log_path, seen)
+            stray = [other for other in panels if other != panel]
+            status = "ok" if not stray and (panel is None or panels) else "FAIL"
+            print(f"{status:<5}{label:<20}{len(panels)} queries, panels {sorted(set(panels))}")
+            if status != "ok":
+                failures.append(f"{label}: expected queries from {panel or 'no panel'}, got {panels}")
+        counts = [caption.value for caption in app.caption if caption.value.endswith("panel's latest run")]
+        if len(counts) != 3:
+            failures.append(f"expected a query count in each of the 3 fragments, found {counts}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that SocialHub panels only run their own queries.")
+    parser.add_argument("--app-dir", default=".", help="directory holding SocialHub.db and the ERD image")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed for each app run")
+    args = parser.parse_args()
+
+    os.chdir(args.app_dir)
+    failures = check(args.timeout)
+    for failure in failures:
+        print(f"   ! {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
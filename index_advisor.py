@@ -0,0 +1,166 @@
+import argparse
+import re
+import sqlite3
+
+from query_catalog import load_catalog
+
+# Covering indexes for the foreign keys the predefined queries join and group on.
+# An index is only proposed when a query plan scans its table or builds a temp
+# B-tree over it and no existing index already starts with the same columns.
+WORKLOAD_INDEXES = [
+    ("follows", ("followee_id", "follower_id")),
+    ("follows", ("follower_id", "followee_id")),
+    ("likes", ("photo_id", "user_id")),
+    ("likes", ("user_id", "photo_id")),
+    ("comments", ("user_id",)),
+    ("comments", ("photo_id",)),
+    ("photos", ("user_id",)),
+    ("photo_tags", ("tag_id", "photo_id")),
+    ("photo_tags", ("photo_id", "tag_id")),
+]
+
+INDEX_USED = re.compile(r"USING (?:COVERING )?INDEX (\S+)|USING (INTEGER PRIMARY KEY)")
+TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|JOIN\b|WHERE\b|GROUP\b|LEFT\b|INNER\b|ORDER\b)(\w+))?", re.I)
+
+
+# Function to collect every SQL query of the catalog as (name, source, sql,
+# params); parameters are bound to their catalog defaults
+def load_workload(catalog=None):
+    catalog = load_catalog() if catalog is None else catalog
+    return [(query.name, query.source, query.sql, query.defaults()) for query in catalog.values() if query.sql]
+
+
+# Function to get the EXPLAIN QUERY PLAN detail lines of a query
+def explain(conn, sql, params=None):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql.strip().rstrip(";"), params or ())]
+
+
+# Function to list the indexes a query plan uses
+def indexes_used(details):
+    used = []
+    for detail in details:
+        for match in INDEX_USED.finditer(detail):
+            name = match.group(1) or "rowid"
+            if name not in used:
+                used.append(name)
+    return used
+
+
+# Function to map the aliases of a query to the tables they name
+def table_aliases(sql, tables):
+    aliases = {}
+    for table, alias in TABLE_ALIAS.findall(sql):
+        if table in tables:
+            aliases[table] = table
+            if alias:
+                aliases[alias] = table
+    return aliases
+
+
+# Function to flag full table scans and temp B-trees in a query plan.
+# Returns (table, finding) pairs; temp B-trees are attributed to the table
+# scanned just before them.
+def plan_findings(details, aliases):
+    findings = []
+    last_table = None
+    for detail in details:
+        if detail.startswith("SCAN "):
+            target = detail.split()[1]
+            last_table = aliases.get(target)
+            if last_table is not None and "INDEX" not in detail:
+                findings.append((last_table, f"full scan: {detail}"))
+        elif detail.startswith("SEARCH "):
+            last_table = aliases.get(detail.split()[1], last_table)
+        elif detail.startswith("USE TEMP B-TREE") and last_table is not None:
+            findings.append((last_table, f"temp B-tree: {detail}"))
+    return findings
+
+
+# Function to get the indexed column lists of a table
+def existing_indexes(conn, table):
+    indexes = []
+    for index in conn.execute(f"PRAGMA index_list('{table}')").fetchall():
+        columns = tuple(row[2] for row in conn.execute(f"PRAGMA index_info('{index[1]}')"))
+        indexes.append(columns)
+    return indexes
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+# Function to analyse every workload query and propose the missing indexes
+def advise(conn, workload=None):
+    workload = load_workload() if workload is None else workload
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    report = []
+    flagged = set()
+    for name, source, sql, params in workload:
+        try:
+            details = explain(conn, sql, params)
+        except sqlite3.Error as e:
+            report.append({"name": name, "source": source, "error": str(e)})
+            continue
+        findings = plan_findings(details, table_aliases(sql, tables))
+        flagged.update(table for table, _ in findings)
+        report.append({"name": name, "source": source, "plan": details,
+                       "indexes": indexes_used(details), "findings": [finding for _, finding in findings]})
+
+    proposals = []
+    for table, columns in WORKLOAD_INDEXES:
+        if table not in flagged:
+            continue
+        if any(existing[:len(columns)] == columns for existing in existing_indexes(conn, table)):
+            continue
+        proposals.append((index_name(table, columns), table, columns))
+    return report, proposals
+
+
+# Function to create the proposed indexes and refresh the planner statistics.
+# Safe to run repeatedly: existing indexes are left alone.
+def apply_indexes(db_path, proposals):
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for name, table, columns in proposals:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the SocialHub query workload for missing indexes.")
+    parser.add_argument("--db", default="SocialHub.db", help="path to the SQLite database")
+    parser.add_argument("--apply", action="store_true", help="create the proposed indexes and run ANALYZE")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        report, proposals = advise(conn)
+    finally:
+        conn.close()
+
+    for entry in report:
+        print(f"== {entry['name']} ({entry['source']})")
+        if "error" in entry:
+            print(f"   error: {entry['error']}")
+            continue
+        for finding in entry["findings"]:
+            print(f"   ! {finding}")
+        print(f"   indexes used: {', '.join(entry['indexes']) or 'none'}")
+
+    if not proposals:
+        print("\nNo missing indexes.")
+        return
+    print("\nProposed indexes:")
+    for name, table, columns in proposals:
+        print(f"   CREATE INDEX {name} ON {table} ({', '.join(columns)});")
+    if args.apply:
+        apply_indexes(args.db, proposals)
+        print("Applied and ran ANALYZE.")
+
+
+if __name__ == "__main__":
+    main()
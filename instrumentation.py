@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+from result_cache import frame_bytes, normalize_sql
+from result_frames import CHUNK_SIZE, rows_to_table, tables_to_frame
+
+# SQLite VM instructions between progress handler calls; vm_steps is counted
+# in these units, so it is accurate to within one interval
+VM_STEP_INTERVAL = 1000
+
+# How many recent query records are kept in memory
+MAX_RECORDS = 1000
+
+PHASES = ("connect", "execute", "fetch", "build")
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    query: str
+    timestamp: float
+    connect: float = 0.0
+    execute: float = 0.0
+    fetch: float = 0.0
+    build: float = 0.0
+    total: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    cache_hit: bool = False
+    vm_steps: int = 0
+    error: str = None
+    panel: str = None
+
+
+# Function to reduce SQL to its shape: literals become ? so the same query
+# with different values shares one fingerprint
+def sql_template(query):
+    template = re.sub(r"'(?:[^']|'')*'", "?", normalize_sql(query))
+    template = re.sub(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])", "?", template)
+    return template
+
+
+# Function to get a short stable fingerprint of a query's shape
+def fingerprint(query):
+    return hashlib.sha1(sql_template(query).encode("utf-8")).hexdigest()[:12]
+
+
+# Function to start a record for a query; fields fill in the measurements
+def query_record(query, **fields):
+    return QueryRecord(fingerprint(query), sql_template(query), time.time(), **fields)
+
+
+# Function to run a query on a pooled connection and time each phase:
+# connect (pool checkout), execute (prepare and step to the first row),
+# fetch (remaining rows) and build (conversion to a compact DataFrame, done
+# chunk by chunk as rows arrive)
+def instrumented_query(pool, query, params=None, chunk_size=CHUNK_SIZE):
+    record = query_record(query)
+    steps = [0]
+
+    def progress():
+        steps[0] += 1
+        return 0
+
+    tables = []
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        connected = time.perf_counter()
+        conn.set_progress_handler(progress, VM_STEP_INTERVAL)
+        try:
+            cursor = conn.execute(query, params or ())
+            record.execute = time.perf_counter() - connected
+            columns = [column[0] for column in cursor.description or ()]
+            while True:
+                fetch_started = time.perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                build_started = time.perf_counter()
+                record.fetch += build_started - fetch_started
+                if not rows:
+                    break
+                tables.append(rows_to_table(columns, rows))
+                record.build += time.perf_counter() - build_started
+        finally:
+            conn.set_progress_handler(None, 0)
+    build_started = time.perf_counter()
+    frame = tables_to_frame(columns, tables)
+    finished = time.perf_counter()
+
+    record.connect = connected - started
+    record.build += finished - build_started
+    record.total = finished - started
+    record.rows = len(frame)
+    record.bytes = frame_bytes(frame)
+    record.vm_steps = steps[0] * VM_STEP_INTERVAL
+    return frame, record
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+# Thread-safe store of recent query records shared by every session.
+# With log_path set each record is also appended there as a JSON line, and
+# with prom_path set a Prometheus text-format file (for the node_exporter
+# textfile collector) is rewritten after each record.
+class QueryRecorder:
+    def __init__(self, max_records=MAX_RECORDS, log_path=None, prom_path=None):
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self._records = deque(maxlen=max_records)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            self._records.append(record)
+            totals = self._totals.setdefault(record.fingerprint, {
+                "query": record.query, "calls": 0, "cache_hits": 0, "errors": 0, "rows": 0, "bytes": 0,
+                "vm_steps": 0, "total": 0.0, **{phase: 0.0 for phase in PHASES}})
+            totals["calls"] += 1
+            totals["cache_hits"] += int(record.cache_hit)
+            totals["errors"] += int(record.error is not None)
+            for field in ("rows", "bytes", "vm_steps", "total") + PHASES:
+                totals[field] += getattr(record, field)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(asdict(record)) + "\n")
+            if self.prom_path:
+                _write_atomic(self.prom_path, self._prometheus())
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    # Function to total the recorded queries per fingerprint, slowest first
+    def summary(self):
+        with self._lock:
+            totals = [dict(values, fingerprint=key) for key, values in self._totals.items()]
+        columns = ["fingerprint", "calls", "cache_hits", "errors", "total", *PHASES, "rows", "bytes", "vm_steps",
+                   "query"]
+        frame = pd.DataFrame(totals, columns=columns)
+        frame["mean_ms"] = frame["total"] / frame["calls"].clip(lower=1) * 1000
+        return frame.sort_values("total", ascending=False, ignore_index=True)
+
+    def to_jsonl(self):
+        return "".join(json.dumps(asdict(record)) + "\n" for record in self.records())
+
+    def _prometheus(self):
+        metrics = [
+            ("socialhub_query_calls_total", "counter", "Queries run, by fingerprint", "calls"),
+            ("socialhub_query_cache_hits_total", "counter", "Queries answered from the result cache", "cache_hits"),
+            ("socialhub_query_errors_total", "counter", "Queries that raised an error", "errors"),
+            ("socialhub_query_rows_total", "counter", "Rows returned", "rows"),
+            ("socialhub_query_bytes_total", "counter", "DataFrame bytes returned", "bytes"),
+            ("socialhub_query_vm_steps_total", "counter", "SQLite VM instructions executed", "vm_steps"),
+        ]
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines += [f"# HELP {name} {help_text}.", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{fingerprint="{key}"}} {values[field]}' for key, values in self._totals.items()]
+        name = "socialhub_query_seconds_total"
+        lines += [f"# HELP {name} Time spent per query phase.", f"# TYPE {name} counter"]
+        for key, values in self._totals.items():
+            lines += [f'{name}{{fingerprint="{key}",phase="{phase}"}} {values[phase]:.6f}' for phase in PHASES]
+        name = "socialhub_query_info"
+        lines += [f"# HELP {name} Normalized SQL of each fingerprint.", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{fingerprint="{key}",query="{_label(values["query"])}"}} 1'
+                  for key, values in self._totals.items()]
+        return "\n".join(lines) + "\n"
+
+    def to_prometheus(self):
+        with self._lock:
+            return self._prometheus()
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
@@ -0,0 +1,95 @@
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+QUERIES_PATH = Path(__file__).resolve().parent / "SocialHub_queries.sql"
+
+ANNOTATION = re.compile(r"^--\s*(category|engine|param):\s*(.*?)\s*$")
+PARAM = re.compile(r"^(\w+)\s*=\s*(\S+)(?:\s+\((.*)\))?$")
+PLACEHOLDER = re.compile(r"(?<!:):(\w+)")
+
+
+@dataclass
+class QueryParam:
+    name: str
+    default: object
+    label: str
+
+
+# One predefined query of the catalog. sql is empty for queries only an
+# in-memory engine (graph, tags) can answer.
+@dataclass
+class CatalogQuery:
+    name: str
+    category: str
+    sql: str = ""
+    params: list = field(default_factory=list)
+    engine: str = None
+    source: str = QUERIES_PATH.name
+
+    def defaults(self):
+        return {param.name: param.default for param in self.params}
+
+
+def _parse_value(text):
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+# Function to parse one "#Query name" block: annotations first, then the SQL
+def _parse_block(block, source):
+    header, _, body = block.partition("\n")
+    query = CatalogQuery(header.strip().rstrip(":").strip(), None, source=source)
+    sql_lines = []
+    for line in body.splitlines():
+        annotation = ANNOTATION.match(line.strip()) if not sql_lines else None
+        if annotation is None:
+            sql_lines.append(line)
+            continue
+        key, value = annotation.groups()
+        if key == "param":
+            param = PARAM.match(value)
+            if param is None:
+                raise ValueError(f"Bad parameter annotation in {query.name!r}: {value!r}")
+            name, default, label = param.groups()
+            query.params.append(QueryParam(name, _parse_value(default), label or name))
+        else:
+            setattr(query, key, value)
+    query.sql = "\n".join(sql_lines).strip()
+
+    if query.category is None:
+        raise ValueError(f"Query {query.name!r} has no category annotation")
+    if not query.sql and query.engine is None:
+        raise ValueError(f"Query {query.name!r} has neither SQL nor an engine")
+    missing = set(PLACEHOLDER.findall(query.sql)) - set(query.defaults())
+    if missing:
+        raise ValueError(f"Query {query.name!r} uses undeclared parameters: {', '.join(sorted(missing))}")
+    return query
+
+
+# Function to load the query catalog from SocialHub_queries.sql, keyed by
+# query name in file order
+def load_catalog(path=QUERIES_PATH):
+    text = Path(path).read_text(encoding="utf-8")
+    text = text.split("-- [Start of SQL Queries]", 1)[-1].split("-- [End of SQL Queries]", 1)[0]
+    catalog = {}
+    for block in re.split(r"^#", text, flags=re.M)[1:]:
+        query = _parse_block(block, Path(path).name)
+        if query.name in catalog:
+            raise ValueError(f"Duplicate query name {query.name!r}")
+        catalog[query.name] = query
+    return catalog
+
+
+# Function to group the catalog's query names by category, in file order
+def categories(catalog):
+    grouped = {}
+    for query in catalog.values():
+        grouped.setdefault(query.category, []).append(query.name)
+    return grouped
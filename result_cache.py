@@ -0,0 +1,115 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+# Quoted strings and identifiers, whose whitespace is significant
+QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])""")
+
+
+# Function to normalize SQL text so formatting differences share a cache entry.
+# Whitespace runs collapse to one space outside quoted strings and identifiers
+# only, so queries that differ inside a literal never share an entry.
+def normalize_sql(query):
+    parts = QUOTED.split(query)
+    parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+# Function to build a cache key from SQL text and its bound parameters
+def cache_key(query, params=None):
+    if params is None:
+        bound = ()
+    elif isinstance(params, dict):
+        bound = tuple(sorted(params.items()))
+    else:
+        bound = tuple(params)
+    return normalize_sql(query), bound
+
+
+# Function to get a token that changes whenever the database file is written.
+# PRAGMA data_version is only comparable within a single connection, so with a
+# pool of connections the file (and WAL) mtime/size is used instead.
+def database_version(db_path):
+    version = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            info = os.stat(path)
+            version.append((info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+# Function to measure how many bytes a DataFrame holds
+def frame_bytes(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+# LRU cache of query results bounded by the total size of the cached DataFrames.
+# Every entry belongs to one database version; seeing a new version drops them all.
+class ResultCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._drop(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, version, frame):
+        nbytes = frame_bytes(frame)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._drop(key)
+            while self._entries and self._bytes + nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+            self._entries[key] = (frame, nbytes, time.monotonic())
+            self._bytes += nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
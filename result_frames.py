@@ -0,0 +1,201 @@
+import csv
+import io
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Rows fetched and converted to Arrow at a time
+CHUNK_SIZE = 10000
+
+# String columns with at most this share of distinct values become pandas
+# categoricals (dictionary encoded); the rest stay Arrow strings
+CATEGORY_RATIO = 0.5
+
+# Exports smaller than this stay in memory; larger ones spill to a temp file
+SPOOL_BYTES = 16 * 1024 * 1024
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+EXPORT_MIME = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+INT_TYPES = (pa.int8(), pa.int16(), pa.int32())
+
+
+# Function to turn a query name into a file name
+def output_name(name):
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower() or "query"
+
+
+# Function to build one Arrow column from SQLite values. SQLite columns can
+# mix types; a column Arrow cannot type is kept as strings.
+def _column(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+
+# Function to convert a chunk of fetched rows into an Arrow table
+def rows_to_table(columns, rows):
+    if not rows:
+        return pa.Table.from_arrays([pa.array([], pa.null()) for _ in columns], names=list(columns))
+    return pa.Table.from_arrays([_column(values) for values in zip(*rows)], names=list(columns))
+
+
+# Function to shrink a table: integers go to the narrowest type that holds
+# them and repetitive strings are dictionary encoded
+def compact_table(table):
+    columns = []
+    for column in table.columns:
+        if pa.types.is_integer(column.type) and column.null_count < len(column):
+            low, high = (value.as_py() for value in pc.min_max(column).values())
+            for int_type in INT_TYPES:
+                info = np.iinfo(int_type.to_pandas_dtype())
+                if info.min <= low and high <= info.max:
+                    column = column.cast(int_type)
+                    break
+        elif pa.types.is_string(column.type) and len(column):
+            if pc.count_distinct(column).as_py() <= CATEGORY_RATIO * len(column):
+                column = column.combine_chunks().dictionary_encode()
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def _pandas_type(arrow_type):
+    if pa.types.is_dictionary(arrow_type) or pa.types.is_null(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+# Function to concatenate fetched chunks, widening types that differ between
+# them (NULL to anything, numbers to float, anything else to strings).
+# Columns are matched by position, so duplicate column names are fine.
+def _concat(tables):
+    positions = [str(position) for position in range(tables[0].num_columns)]
+    tables = [table.rename_columns(positions) for table in tables]
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    schema = []
+    for position in positions:
+        types = {table.schema.field(position).type for table in tables} - {pa.null()}
+        if len(types) == 1:
+            schema.append(pa.field(position, types.pop()))
+        elif all(pa.types.is_integer(kind) or pa.types.is_floating(kind) for kind in types):
+            schema.append(pa.field(position, pa.float64()))
+        else:
+            schema.append(pa.field(position, pa.string()))
+    return pa.concat_tables([table.cast(pa.schema(schema)) for table in tables])
+
+
+# Function to turn fetched Arrow chunks into one compact DataFrame: Arrow-backed
+# numeric and string columns, categoricals for repetitive strings
+def tables_to_frame(columns, tables):
+    positions = [str(position) for position in range(len(columns))]
+    table = _concat(tables) if tables else rows_to_table(positions, [])
+    frame = compact_table(table.rename_columns(positions)).to_pandas(types_mapper=_pandas_type)
+    frame.columns = list(columns)
+    return frame
+
+
+# Function to fetch every row of a cursor into a compact DataFrame, converting
+# chunk_size rows at a time so the Python row tuples never pile up
+def fetch_frame(cursor, chunk_size=CHUNK_SIZE):
+    columns = [column[0] for column in cursor.description or ()]
+    tables = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        tables.append(rows_to_table(columns, rows))
+    return tables_to_frame(columns, tables)
+
+
+# CSV output written chunk by chunk to a path or a binary file object
+class CsvSink:
+    def __init__(self, target):
+        self.owned = isinstance(target, str)
+        raw = open(target, "wb") if self.owned else target
+        self.file = io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=True)
+        self.writer = csv.writer(self.file)
+        self.started = False
+
+    def write(self, columns, rows):
+        if not self.started:
+            self.writer.writerow(columns)
+            self.started = True
+        self.writer.writerows(rows)
+
+    def close(self, columns):
+        if not self.started:
+            self.writer.writerow(columns)
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.detach()
+
+
+# Parquet output, one row group per chunk. The schema comes from the first
+# chunk (columns that are all NULL there are stored as strings).
+class ParquetSink:
+    def __init__(self, target):
+        self.target = target
+        self.writer = None
+
+    def write(self, columns, rows):
+        table = rows_to_table(columns, rows)
+        if self.writer is None:
+            schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                for field in table.schema])
+            self.writer = pq.ParquetWriter(self.target, schema)
+        try:
+            table = table.cast(self.writer.schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"A column changed type between chunks ({e}); use CSV or a larger chunk size.") from e
+        self.writer.write_table(table)
+
+    def close(self, columns):
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.target, pa.schema([(column, pa.string()) for column in columns]))
+        self.writer.close()
+
+
+def open_sink(target, fmt):
+    return ParquetSink(target) if fmt == "parquet" else CsvSink(target)
+
+
+# Function to write (columns, row chunks) to a temporary file and return it
+# rewound, ready to be downloaded
+def export_chunks(columns, chunks, fmt):
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    sink = open_sink(buffer, fmt)
+    for rows in chunks:
+        sink.write(columns, rows)
+    sink.close(columns)
+    buffer.seek(0)
+    return buffer
+
+
+# Function to export a query by streaming its cursor in chunks
+def export_cursor(cursor, fmt, chunk_size=CHUNK_SIZE):
+    columns = [column[0] for column in cursor.description or ()]
+    return export_chunks(columns, iter(lambda: cursor.fetchmany(chunk_size), []), fmt)
+
+
+# Function to split a DataFrame into chunks of row tuples, with missing values
+# (NaN, NA, NaT) as None
+def frame_chunks(frame, chunk_size=CHUNK_SIZE):
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size].astype(object)
+        yield list(chunk.where(chunk.notna(), None).itertuples(index=False, name=None))
+
+
+# Function to export a DataFrame that is already in memory, chunk by chunk
+def export_frame(frame, fmt, chunk_size=CHUNK_SIZE):
+    return export_chunks(list(frame.columns), frame_chunks(frame, chunk_size), fmt)
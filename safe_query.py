@@ -0,0 +1,127 @@
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from result_frames import rows_to_table, tables_to_frame
+
+# Statements a read-only query may start with
+READ_ONLY_KEYWORDS = ("SELECT", "WITH", "VALUES", "EXPLAIN")
+
+# Authorizer actions a read-only query may perform; anything else (writes,
+# schema changes, ATTACH, PRAGMA, transactions) is denied while preparing
+READ_ONLY_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+# How many SQLite VM instructions run between time budget checks
+PROGRESS_STEPS = 10000
+
+
+class QueryRejected(Exception):
+    pass
+
+
+@dataclass
+class GuardedResult:
+    frame: pd.DataFrame
+    rows: int
+    elapsed: float
+    truncated: bool = False
+    reason: str = None
+    vm_steps: int = 0
+
+
+# Function to strip SQL comments so the leading keyword can be checked
+def strip_comments(query):
+    query = re.sub(r"/\*.*?\*/", " ", query, flags=re.S)
+    return re.sub(r"--[^\n]*", " ", query)
+
+
+# Function to reject anything but a single read-only statement before it runs
+def check_read_only(query):
+    statement = strip_comments(query).strip()
+    if not statement:
+        raise QueryRejected("The query is empty.")
+    keyword = statement.split(None, 1)[0].upper()
+    if keyword not in READ_ONLY_KEYWORDS:
+        raise QueryRejected(f"Only read-only queries are allowed; {keyword} statements are rejected.")
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    return sqlite3.SQLITE_OK if action in READ_ONLY_ACTIONS else sqlite3.SQLITE_DENY
+
+
+# Function to run a read-only query under a time budget, row cap and byte cap.
+# Rows are fetched in chunks and converted to Arrow as they arrive (the byte
+# cap counts Arrow bytes); on_chunk(chunk, rows_so_far) is called for each
+# chunk that starts within the first preview_rows rows (all chunks when it is
+# None) so callers can render early rows, and setting cancel_event stops the query.
+def run_guarded(conn, query, params=None, time_budget=10.0, max_rows=100000, max_bytes=64 * 1024 * 1024,
+                chunk_size=1000, on_chunk=None, cancel_event=None, preview_rows=None):
+    check_read_only(query)
+    started = time.perf_counter()
+    deadline = started + time_budget
+    stopped = {"reason": None, "calls": 0}
+
+    def progress():
+        stopped["calls"] += 1
+        if cancel_event is not None and cancel_event.is_set():
+            stopped["reason"] = "cancelled"
+            return 1
+        if time.perf_counter() > deadline:
+            stopped["reason"] = "time budget"
+            return 1
+        return 0
+
+    chunks = []
+    columns = []
+    rows = 0
+    nbytes = 0
+    reason = None
+    cursor = None
+    conn.set_authorizer(_authorize)
+    conn.set_progress_handler(progress, PROGRESS_STEPS)
+    try:
+        try:
+            cursor = conn.execute(query, params or ())
+        except sqlite3.DatabaseError as e:
+            if "not authorized" in str(e):
+                raise QueryRejected(f"Only read-only queries are allowed: {e}") from e
+            raise
+        columns = [column[0] for column in cursor.description or ()]
+        while rows < max_rows:
+            batch = cursor.fetchmany(min(chunk_size, max_rows - rows))
+            if not batch:
+                break
+            chunk = rows_to_table(columns, batch)
+            if nbytes + chunk.nbytes > max_bytes:
+                chunk = chunk.slice(0, int(chunk.num_rows * (max_bytes - nbytes) / chunk.nbytes))
+                reason = "byte cap"
+            chunks.append(chunk)
+            rows += chunk.num_rows
+            nbytes += chunk.nbytes
+            previewing = preview_rows is None or rows - chunk.num_rows < preview_rows
+            if on_chunk is not None and chunk.num_rows and previewing:
+                on_chunk(tables_to_frame(columns, [chunk]), rows)
+            if reason is not None:
+                break
+        if reason is None and rows >= max_rows and cursor.fetchone() is not None:
+            reason = "row cap"
+    except sqlite3.OperationalError:
+        if stopped["reason"] is None:
+            raise
+        reason = stopped["reason"]
+    finally:
+        if cursor is not None:
+            cursor.close()
+        conn.set_progress_handler(None, 0)
+        conn.set_authorizer(None)
+
+    return GuardedResult(tables_to_frame(columns, chunks), rows, time.perf_counter() - started, reason is not None, reason,
+                         stopped["calls"] * PROGRESS_STEPS)
@@ -0,0 +1,170 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from connection_pool import read_only_uri
+from result_cache import database_version
+
+# Seconds between checks of the source database for changes
+REFRESH_SECONDS = 30.0
+
+# Pages copied per backup step; between steps the source is unlocked, so
+# writers to the source are never blocked for the whole copy
+BACKUP_PAGES = 1024
+
+_snapshot_ids = itertools.count(1)
+
+
+# Function to build the URI of a named in-memory database. The memdb VFS
+# shares it between every connection of this process (without shared-cache
+# table locks) and frees it when its last connection closes.
+def memory_uri(name, read_only=False):
+    return f"file:/{name}?vfs=memdb" + ("&mode=ro" if read_only else "")
+
+
+# One in-memory copy of the database. The anchor connection keeps the copy
+# alive until the snapshot is retired.
+@dataclass
+class Snapshot:
+    name: str
+    version: tuple
+    data_version: int
+    created: float
+    nbytes: int
+    build_seconds: float
+    anchor: sqlite3.Connection = field(repr=False)
+
+    @property
+    def uri(self):
+        return memory_uri(self.name, read_only=True)
+
+    def age(self):
+        return time.time() - self.created
+
+    def close(self):
+        self.anchor.close()
+
+
+def _data_version(conn):
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+# Function to copy the database into a new in-memory snapshot with the
+# online backup API. watch is the refresher's connection to the source, whose
+# PRAGMA data_version is recorded alongside the file version.
+def build_snapshot(db_path, watch=None, pages=BACKUP_PAGES):
+    started = time.perf_counter()
+    version = database_version(db_path)
+    data_version = _data_version(watch) if watch is not None else 0
+    name = f"socialhub-snapshot-{os.getpid()}-{next(_snapshot_ids)}"
+    source = sqlite3.connect(read_only_uri(db_path), uri=True)
+    anchor = sqlite3.connect(memory_uri(name), uri=True, check_same_thread=False)
+    try:
+        source.backup(anchor, pages=pages)
+        page_count = anchor.execute("PRAGMA page_count").fetchone()[0]
+        page_size = anchor.execute("PRAGMA page_size").fetchone()[0]
+    except Exception:
+        anchor.close()
+        raise
+    finally:
+        source.close()
+    return Snapshot(name, version, data_version, time.time(), page_count * page_size,
+                    time.perf_counter() - started, anchor)
+
+
+# Serves reads from an in-memory snapshot of a database file. A background
+# thread checks the file's mtime/size and PRAGMA data_version every interval
+# seconds; when either changed it builds a new snapshot next to the current
+# one, then swaps it in and retargets the attached pools. Queries already
+# running finish on the old snapshot, which is freed when they release their
+# connections.
+class SnapshotManager:
+    def __init__(self, db_path, interval=REFRESH_SECONDS, pages=BACKUP_PAGES):
+        self.db_path = db_path
+        self.interval = interval
+        self.pages = pages
+        self._snapshot = None
+        self._pools = []
+        self._watch = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"refreshes": 0, "checks": 0, "last_error": None}
+
+    # Function to build the first snapshot and start the refresher thread
+    def start(self):
+        self._watch = sqlite3.connect(read_only_uri(self.db_path), uri=True, check_same_thread=False)
+        self.refresh(force=True)
+        self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+        self._thread.start()
+        return self
+
+    # Function to serve a pool's connections from the snapshot, now and after
+    # every refresh
+    def serve(self, pool):
+        with self._lock:
+            self._pools.append(pool)
+            uri = self._snapshot.uri
+        pool.retarget(uri)
+        return pool
+
+    @property
+    def current(self):
+        with self._lock:
+            return self._snapshot
+
+    # Function to get the version of the data being served, for cache keys
+    def version(self):
+        return self.current.version
+
+    # Function to rebuild the snapshot when the source changed (or always, with
+    # force) and swap it in; returns whether a new snapshot was installed
+    def refresh(self, force=False):
+        with self._refresh_lock:
+            self._stats["checks"] += 1
+            if not force and self._snapshot is not None:
+                unchanged = (database_version(self.db_path) == self._snapshot.version
+                             and _data_version(self._watch) == self._snapshot.data_version)
+                if unchanged:
+                    return False
+            snapshot = build_snapshot(self.db_path, self._watch, self.pages)
+            with self._lock:
+                old, self._snapshot = self._snapshot, snapshot
+                pools = list(self._pools)
+                self._stats["refreshes"] += 1
+            for pool in pools:
+                pool.retarget(snapshot.uri)
+            if old is not None:
+                old.close()
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+                self._stats["last_error"] = None
+            except Exception as e:
+                self._stats["last_error"] = str(e)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+        if snapshot is not None:
+            snapshot.close()
+        if self._watch is not None:
+            self._watch.close()
+
+    def stats(self):
+        snapshot = self.current
+        stats = dict(self._stats)
+        if snapshot is not None:
+            stats.update(bytes=snapshot.nbytes, age=snapshot.age(), build_seconds=snapshot.build_seconds,
+                         version=snapshot.version)
+        return stats
@@ -0,0 +1,164 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from connection_pool import DEFAULT_PRAGMAS, read_only_uri
+from engagement_stats import STATS_QUERIES, stats_available
+from query_catalog import load_catalog
+from result_frames import CHUNK_SIZE, EXPORT_FORMATS, frame_chunks, open_sink, output_name
+from safe_query import PROGRESS_STEPS, check_read_only
+
+
+# Function to open a read-only connection with the app's pragmas
+def connect(db_path):
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+    for name, value in DEFAULT_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+# Function to answer an engine-backed catalog query as its columns and an
+# iterator over row chunks
+def _engine_chunks(conn, task, chunk_size):
+    if task["engine"] == "graph":
+        from follow_graph import FollowGraph, answer_query
+        frame, _ = answer_query(FollowGraph.from_connection(conn), conn, task["name"], task["params"])
+    else:
+        from tag_similarity import TagIndex, answer_query
+        frame, _ = answer_query(TagIndex.from_connection(conn), conn, task["params"])
+    return list(frame.columns), frame_chunks(frame, chunk_size)
+
+
+# Function to stream a SQL query as its columns and an iterator over row chunks
+def _sql_chunks(conn, task, chunk_size):
+    cursor = conn.execute(task["sql"], task["params"])
+    return [column[0] for column in cursor.description or ()], iter(lambda: cursor.fetchmany(chunk_size), [])
+
+
+# Function to run one task in a worker process and write its output file.
+# SQL queries are stopped once they run past timeout seconds; a failed or
+# timed-out query leaves no output file behind.
+def run_task(db_path, task, out_path, fmt, chunk_size, timeout):
+    started = time.perf_counter()
+    summary = {"name": task["name"], "path": out_path, "rows": 0, "status": "ok"}
+    conn = connect(db_path)
+    if timeout:
+        deadline = started + timeout
+        conn.set_progress_handler(lambda: int(time.perf_counter() > deadline), PROGRESS_STEPS)
+    columns = []
+    sink = None
+    try:
+        sink = open_sink(out_path, fmt)
+        read = _engine_chunks if task["engine"] else _sql_chunks
+        columns, chunks = read(conn, task, chunk_size)
+        for rows in chunks:
+            sink.write(columns, rows)
+            summary["rows"] += len(rows)
+    except sqlite3.OperationalError as e:
+        summary["status"] = "timeout" if timeout and time.perf_counter() > deadline else f"error: {e}"
+    except Exception as e:
+        summary["status"] = f"error: {e}"
+    finally:
+        if sink is not None:
+            sink.close(columns)
+        conn.close()
+    if summary["status"] != "ok" and os.path.exists(out_path):
+        os.remove(out_path)
+    summary["seconds"] = time.perf_counter() - started
+    return summary
+
+
+# Function to build the task list: catalog queries by name (all of them when
+# none are named) and custom SQL files, with parameter overrides applied
+def build_tasks(db_path, names, sql_files, overrides, use_counters=True):
+    catalog = load_catalog()
+    if not names and not sql_files:
+        names = list(catalog)
+    unknown = [name for name in names if name not in catalog]
+    if unknown:
+        raise SystemExit(f"Unknown queries: {', '.join(unknown)}")
+
+    conn = connect(db_path)
+    try:
+        counters = use_counters and stats_available(conn)
+    finally:
+        conn.close()
+
+    tasks = []
+    for name in names:
+        entry = catalog[name]
+        params = {key: overrides.get(key, value) for key, value in entry.defaults().items()}
+        sql = STATS_QUERIES[name] if counters and name in STATS_QUERIES else entry.sql
+        tasks.append({"name": name, "sql": sql, "params": params, "engine": entry.engine})
+    for path in sql_files:
+        sql = Path(path).read_text(encoding="utf-8")
+        check_read_only(sql)
+        tasks.append({"name": Path(path).stem, "sql": sql, "params": dict(overrides), "engine": None})
+    return tasks
+
+
+def _parse_override(text):
+    key, _, value = text.partition("=")
+    for kind in (int, float):
+        try:
+            return key, kind(value)
+        except ValueError:
+            pass
+    return key, {"true": True, "false": False}.get(value.lower(), value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SocialHub queries headlessly and write one file per query.")
+    parser.add_argument("--db", default="SocialHub.db", help="path to the SQLite database")
+    parser.add_argument("--query", action="append", default=[], metavar="NAME",
+                        help="catalog query to run (repeatable); all catalog queries when no --query/--sql-file")
+    parser.add_argument("--sql-file", action="append", default=[], metavar="PATH", help="custom SQL file to run (repeatable)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE", help="override a query parameter")
+    parser.add_argument("--out-dir", default="reports", help="directory for the output files")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="output format")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows fetched and written at a time")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per SQL query")
+    parser.add_argument("--no-counters", action="store_true", help="do not use the engagement counter tables")
+    parser.add_argument("--list", action="store_true", help="list the catalog queries and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, entry in load_catalog().items():
+            params = ", ".join(f"{key}={value}" for key, value in entry.defaults().items())
+            print(f"{entry.category:<12} {name}" + (f"  [{params}]" if params else ""))
+        return
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Database not found: {args.db}")
+    tasks = build_tasks(args.db, args.query, args.sql_file, dict(map(_parse_override, args.param)),
+                        use_counters=not args.no_counters)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.processes, len(tasks)))) as executor:
+        futures = [executor.submit(run_task, args.db, task,
+                                   os.path.join(args.out_dir, f"{output_name(task['name'])}.{args.format}"),
+                                   args.format, args.chunk_size, args.timeout)
+                   for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['seconds']:>9.2f}s {result['rows']:>12,} rows  {result['name'][:55]:<55} {result['status']}")
+
+    elapsed = time.perf_counter() - started
+    failed = [result for result in results if result["status"] != "ok"]
+    print(f"\n{len(results) - len(failed)}/{len(results)} queries written to {args.out_dir} in {elapsed:.2f}s "
+          f"(query time {sum(result['seconds'] for result in results):.2f}s, "
+          f"slowest {max(results, key=lambda result: result['seconds'])['name']!r}).")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
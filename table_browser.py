@@ -0,0 +1,98 @@
+import pandas as pd
+
+ROWID_COLUMN = "__rowid__"
+SORT_COLUMN = "__sortkey__"
+
+
+# Function to quote an SQLite identifier
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+# Function to list the columns of a table
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")]
+
+
+# Function to list the columns a page can be sorted or filtered on without a
+# full scan: rowid, an INTEGER PRIMARY KEY alias and leading index columns
+def indexed_columns(conn, table):
+    columns = ["rowid"]
+    info = conn.execute(f"PRAGMA table_info({quote_identifier(table)})").fetchall()
+    pk = [row for row in info if row[5]]
+    if len(pk) == 1 and pk[0][2].upper() == "INTEGER":
+        columns.append(pk[0][1])
+    for index in conn.execute(f"PRAGMA index_list({quote_identifier(table)})").fetchall():
+        leading = conn.execute(f"PRAGMA index_info({quote_identifier(index[1])})").fetchone()
+        if leading is not None and leading[2] is not None and leading[2] not in columns:
+            columns.append(leading[2])
+    return columns
+
+
+# Function to estimate the number of rows in a table without counting them.
+# Uses the ANALYZE statistics when present, otherwise the largest rowid.
+def approximate_row_count(conn, table):
+    has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+    if has_stats:
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? AND stat IS NOT NULL LIMIT 1", (table,)).fetchone()
+        if row is not None:
+            return int(row[0].split()[0])
+    row = conn.execute(f"SELECT MAX(rowid) FROM {quote_identifier(table)}").fetchone()
+    return int(row[0] or 0)
+
+
+# Function to build the query for one page of a table using a keyset cursor.
+# The cursor is the (sort value, rowid) of the last row of the previous page, so
+# every page is an index range scan instead of an OFFSET scan. NULL sort values
+# (first when ascending, last when descending, as SQLite orders them) never
+# compare with a cursor, so they are paged by rowid in a segment of their own.
+def page_query(table, columns, page_size, cursor=None, sort_column="rowid", descending=False,
+               filter_column=None, filter_value=None):
+    if not columns:
+        raise ValueError("At least one column must be selected")
+    sort_column = sort_column or "rowid"
+    sort_sql = "rowid" if sort_column == "rowid" else quote_identifier(sort_column)
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+
+    where = []
+    params = []
+    if filter_column is not None:
+        where.append(f"{quote_identifier(filter_column)} = ?")
+        params.append(filter_value)
+    if cursor is not None:
+        if sort_column == "rowid":
+            where.append(f"rowid {comparison} ?")
+            params.append(cursor[1])
+        elif cursor[0] is None:
+            where.append(f"(({sort_sql} IS NULL AND rowid {comparison} ?)"
+                         + ("" if descending else f" OR {sort_sql} IS NOT NULL") + ")")
+            params.append(cursor[1])
+        else:
+            where.append(f"(({sort_sql}, rowid) {comparison} (?, ?)"
+                         + (f" OR {sort_sql} IS NULL" if descending else "") + ")")
+            params.extend(cursor)
+
+    select = ", ".join(quote_identifier(column) for column in columns)
+    if sort_column != "rowid":
+        select += f", {sort_sql} AS {SORT_COLUMN}"
+    query = f"SELECT rowid AS {ROWID_COLUMN}, {select} FROM {quote_identifier(table)}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {sort_sql} {direction}, rowid {direction} LIMIT ?"
+    params.append(int(page_size))
+    return query, params
+
+
+# Function to get the cursor that starts the page after a fetched one
+def next_cursor(page):
+    if page.empty:
+        return None
+    last = page.iloc[-1]
+    rowid = int(last[ROWID_COLUMN])
+    if SORT_COLUMN not in page.columns:
+        return (rowid, rowid)
+    value = last[SORT_COLUMN]
+    if pd.isna(value):
+        return (None, rowid)
+    return (value.item() if hasattr(value, "item") else value, rowid)
@@ -0,0 +1,286 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound on the (photo, candidate) pairs expanded at once while scanning
+# posting lists; keeps peak memory flat regardless of the number of photos
+PAIR_BUDGET = 4000000
+
+# Prime just above 2**32 for the MinHash universal hash functions
+MINHASH_PRIME = 4294967311
+
+FETCH_SIZE = 100000
+
+# Most photo pairs answer_query returns; low thresholds can match millions of
+# pairs, which would exhaust the server's memory before they reach the screen
+MAX_PAIRS = 100000
+
+# LSH bands are chosen so that the S-curve turns at this fraction of the
+# Jaccard threshold; pairs right at the threshold then become candidates with
+# high probability instead of about 63% when the curve turns at the threshold
+LSH_TURN = 0.75
+
+
+# Function to expand the concatenation of several CSR rows into one index array
+def _expand_ranges(starts, lengths):
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return offsets + np.arange(total)
+
+
+# Function to build photo -> tags and tag -> photos CSR arrays from
+# (photo, tag) entries already sorted by photo
+def _csr(photo_index, tag_index, n_photos, n_tags):
+    photo_indptr = np.concatenate(([0], np.cumsum(np.bincount(photo_index, minlength=n_photos))))
+    tag_indptr = np.concatenate(([0], np.cumsum(np.bincount(tag_index, minlength=n_tags))))
+    tag_photos = photo_index[np.argsort(tag_index, kind="stable")]
+    return photo_indptr, tag_index, tag_indptr, tag_photos
+
+
+# Inverted tag -> photos index over photo_tags, stored as two CSR structures of
+# int32 arrays (photo -> tags and tag -> photos) over dense photo/tag numbers
+class TagIndex:
+    def __init__(self, photo_ids, tag_ids):
+        pairs = np.unique(np.stack([np.asarray(photo_ids, dtype=np.int64), np.asarray(tag_ids, dtype=np.int64)]), axis=1)
+        self.photo_ids, photo_index = np.unique(pairs[0], return_inverse=True)
+        tag_ids, tag_index = np.unique(pairs[1], return_inverse=True)
+
+        # Tags are numbered from rarest to most common and each photo's tags are
+        # kept in that order, so a photo's rarest tags form a prefix of its row
+        rank = np.empty(len(tag_ids), dtype=np.int32)
+        rank[np.argsort(np.bincount(tag_index, minlength=len(tag_ids)), kind="stable")] = np.arange(len(tag_ids))
+        self.tag_ids = np.empty_like(tag_ids)
+        self.tag_ids[rank] = tag_ids
+        tag_index = rank[tag_index]
+        order = np.lexsort((tag_index, photo_index))
+        photo_index = photo_index[order].astype(np.int32)
+        tag_index = tag_index[order].astype(np.int32)
+
+        self.photo_indptr, self.photo_tags, self.tag_indptr, self.tag_photos = _csr(photo_index, tag_index,
+                                                                                    len(self.photo_ids), len(self.tag_ids))
+        self.tags_per_photo = np.diff(self.photo_indptr).astype(np.int32)
+        self._entry_keys = photo_index.astype(np.int64) * max(len(self.tag_ids), 1) + tag_index
+        self._signatures = None
+
+    @classmethod
+    def from_connection(cls, conn):
+        cursor = conn.execute("SELECT photo_id, tag_id FROM photo_tags")
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64))
+        pairs = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.int64)
+        return cls(pairs[:, 0], pairs[:, 1])
+
+    def nbytes(self):
+        arrays = (self.photo_ids, self.tag_ids, self.photo_indptr, self.photo_tags, self.tag_indptr, self.tag_photos,
+                  self.tags_per_photo, self._entry_keys)
+        return sum(array.nbytes for array in arrays)
+
+    # Function to expand the posting lists of the given photos' tags into
+    # (photo, candidate) pairs; only photos sharing a tag are ever generated
+    def _candidates(self, photos, index=None):
+        photo_indptr, photo_tags, tag_indptr, tag_photos = index or (self.photo_indptr, self.photo_tags,
+                                                                     self.tag_indptr, self.tag_photos)
+        starts = photo_indptr[photos]
+        lengths = photo_indptr[photos + 1] - starts
+        sources = np.repeat(photos, lengths)
+        tags = photo_tags[_expand_ranges(starts, lengths)]
+        posting_starts = tag_indptr[tags]
+        posting_lengths = tag_indptr[tags + 1] - posting_starts
+        candidates = tag_photos[_expand_ranges(posting_starts, posting_lengths)]
+        return np.repeat(sources, posting_lengths), candidates
+
+    # Function to count the tags each candidate pair shares by probing the
+    # candidate's (photo, tag) entries with every tag of the source photo
+    def _overlap(self, sources, candidates):
+        lengths = self.tags_per_photo[sources]
+        tags = self.photo_tags[_expand_ranges(self.photo_indptr[sources], lengths)]
+        probes = np.repeat(candidates.astype(np.int64), lengths) * max(len(self.tag_ids), 1) + tags
+        positions = np.minimum(np.searchsorted(self._entry_keys, probes), len(self._entry_keys) - 1)
+        hits = (self._entry_keys[positions] == probes).astype(np.int32)
+        return np.add.reduceat(hits, np.concatenate(([0], np.cumsum(lengths)[:-1])))
+
+    # Function to score unique candidate pairs and keep those passing the thresholds
+    def _score(self, sources, candidates, min_shared, min_jaccard):
+        keys = np.unique(sources.astype(np.int64) * len(self.photo_ids) + candidates)
+        sources, candidates = np.divmod(keys, len(self.photo_ids))
+        if not len(keys):
+            return sources, candidates, keys, keys.astype(np.float64)
+        shared = self._overlap(sources, candidates)
+        jaccard = shared / (self.tags_per_photo[sources] + self.tags_per_photo[candidates] - shared)
+        keep = (shared >= min_shared) & (jaccard >= min_jaccard)
+        return sources[keep], candidates[keep], shared[keep], jaccard[keep]
+
+    # Function to build the inverted index over each photo's rarest tags only.
+    # Two photos sharing at least min_shared tags must share one of the first
+    # len - min_shared + 1 tags of each (prefix filtering), so common tags that
+    # would dominate candidate generation are skipped.
+    def _prefix_index(self, min_shared):
+        lengths = self.tags_per_photo
+        position = np.arange(len(self.photo_tags)) - np.repeat(self.photo_indptr[:-1], lengths)
+        in_prefix = position < np.repeat(lengths - min_shared + 1, lengths)
+        photos = np.repeat(np.arange(len(self.photo_ids), dtype=np.int32), lengths)[in_prefix]
+        return _csr(photos, self.photo_tags[in_prefix], len(self.photo_ids), len(self.tag_ids))
+
+    # Function to find every pair of photos sharing at least min_shared tags
+    # (and, optionally, with a Jaccard similarity of at least min_jaccard).
+    # With limit set, scanning stops once at least limit pairs were found.
+    def similar_pairs(self, min_shared=3, min_jaccard=0.0, limit=None):
+        min_shared = max(int(min_shared), 1)
+        index = self._prefix_index(min_shared)
+        photo_indptr, photo_tags, tag_indptr, _ = index
+        if len(photo_tags):
+            cost = np.diff(tag_indptr)[photo_tags]
+            cost = np.add.reduceat(np.concatenate((cost, [0])), photo_indptr[:-1])
+            cost[np.diff(photo_indptr) == 0] = 0
+        else:
+            cost = []
+        results = []
+        found = 0
+        start = 0
+        while start < len(cost) and (limit is None or found < limit):
+            end = start + max(1, int(np.searchsorted(np.cumsum(cost[start:]), PAIR_BUDGET, side="right")))
+            sources, candidates = self._candidates(np.arange(start, end), index)
+            later = candidates > sources
+            results.append(self._score(sources[later], candidates[later], min_shared, min_jaccard))
+            found += len(results[-1][0])
+            start = end
+        return self._pairs_frame(results)
+
+    # Function to find the k photos sharing the most tags with one photo
+    def similar_to(self, photo_id, k=10, min_shared=1, min_jaccard=0.0):
+        position = np.searchsorted(self.photo_ids, photo_id)
+        if position == len(self.photo_ids) or self.photo_ids[position] != photo_id:
+            return self._pairs_frame([])
+        sources, candidates = self._candidates(np.array([position]))
+        other = candidates != sources
+        frame = self._pairs_frame([self._score(sources[other], candidates[other], min_shared, min_jaccard)])
+        return frame.sort_values(["shared_tags", "jaccard", "similar_photo_id"], ascending=[False, False, True]).head(k)
+
+    def _pairs_frame(self, results):
+        columns = ["id", "similar_photo_id", "shared_tags", "jaccard"]
+        if not results:
+            return pd.DataFrame(columns=columns)
+        sources, candidates, shared, jaccard = (np.concatenate(parts) for parts in zip(*results))
+        return pd.DataFrame({"id": self.photo_ids[sources], "similar_photo_id": self.photo_ids[candidates],
+                             "shared_tags": shared, "jaccard": jaccard}, columns=columns)
+
+    # Function to compute (and keep) a MinHash signature per photo
+    def minhash_signatures(self, num_perm=64, seed=1):
+        if self._signatures is not None and self._signatures.shape[1] == num_perm:
+            return self._signatures
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        tags = self.photo_tags.astype(np.uint64)
+        signatures = np.empty((len(self.photo_ids), num_perm), dtype=np.uint32)
+        for column in range(num_perm):
+            hashed = (a[column] * tags + b[column]) % np.uint64(MINHASH_PRIME)
+            signatures[:, column] = np.minimum.reduceat(hashed, self.photo_indptr[:-1]).astype(np.uint32)
+        self._signatures = signatures
+        return signatures
+
+    # Function to find photo pairs with a Jaccard similarity of at least
+    # threshold using MinHash with LSH banding. Candidates are verified against
+    # the index, so every pair returned is a true match with its exact scores;
+    # a pair at the threshold is missed with probability 1 - lsh_recall().
+    # With limit set, banding stops once at least limit pairs were found.
+    def approximate_pairs(self, threshold=0.5, num_perm=64, seed=1, min_shared=1, limit=None):
+        signatures = self.minhash_signatures(num_perm, seed)
+        rows = _band_rows(threshold, num_perm)
+        n = len(self.photo_ids)
+        results = []
+        found = 0
+        for band in range(num_perm // rows):
+            if limit is not None and found >= limit:
+                break
+            band_hash = np.zeros(n, dtype=np.uint64)
+            for column in signatures[:, band * rows:(band + 1) * rows].T:
+                band_hash = band_hash * np.uint64(1000003) ^ column.astype(np.uint64)
+            order = np.argsort(band_hash, kind="stable").astype(np.int64)
+            # Pair every photo with the photos after it in its bucket, verifying
+            # at most PAIR_BUDGET candidate pairs at once
+            bucket_ends = np.flatnonzero(np.diff(band_hash[order], append=band_hash[order[-1:]] + np.uint64(1))) + 1
+            lengths = np.repeat(bucket_ends, np.diff(np.concatenate(([0], bucket_ends)))) - np.arange(n) - 1
+            start = 0
+            band_found = 0
+            # A pair shares at most one bucket per band, so a band alone never repeats a pair
+            while start < n and (limit is None or band_found < limit):
+                end = start + max(1, int(np.searchsorted(np.cumsum(lengths[start:]), PAIR_BUDGET, side="right")))
+                sources = np.repeat(order[start:end], lengths[start:end])
+                candidates = order[_expand_ranges(np.arange(start, end) + 1, lengths[start:end])]
+                results.append(self._score(np.minimum(sources, candidates), np.maximum(sources, candidates),
+                                           min_shared, threshold))
+                band_found += len(results[-1][0])
+                start = end
+            if limit is not None:
+                # Bands find the same pairs again, so only distinct ones count
+                found = len(np.unique(np.concatenate([pair_sources * n + pair_candidates
+                                                      for pair_sources, pair_candidates, _, _ in results])))
+        if not results:
+            return self._pairs_frame([])
+        sources, candidates, shared, jaccard = (np.concatenate(parts) for parts in zip(*results))
+        _, first = np.unique(sources * n + candidates, return_index=True)
+        return self._pairs_frame([(sources[first], candidates[first], shared[first], jaccard[first])])
+
+
+# Function to pick rows per LSH band (with num_perm // rows bands) so that
+# the S-curve turns, at (1/bands)^(1/rows), as close below LSH_TURN times the
+# threshold as possible
+def _band_rows(threshold, num_perm):
+    turns = {rows: (1 / (num_perm // rows)) ** (1 / rows) for rows in range(1, num_perm + 1)}
+    below = [rows for rows, turn in turns.items() if turn <= LSH_TURN * threshold]
+    return max(below, key=turns.get) if below else 1
+
+
+# Function to get the probability that a pair with the given Jaccard
+# similarity becomes an LSH candidate
+def lsh_recall(similarity, threshold, num_perm=64):
+    rows = _band_rows(threshold, num_perm)
+    return 1 - (1 - similarity ** rows) ** (num_perm // rows)
+
+
+# Function to add the image URLs of both photos of each pair
+def with_image_urls(conn, pairs):
+    ids = pd.unique(pd.concat([pairs["id"], pairs["similar_photo_id"]])).tolist()
+    urls = []
+    for start in range(0, len(ids), 500):
+        batch = ids[start:start + 500]
+        placeholders = ", ".join("?" * len(batch))
+        urls.extend(conn.execute(f"SELECT id, image_url FROM photos WHERE id IN ({placeholders})", batch).fetchall())
+    urls = pd.DataFrame(urls, columns=["id", "image_url"])
+    frame = pairs.merge(urls, on="id")
+    frame = frame.merge(urls.rename(columns={"id": "similar_photo_id", "image_url": "The_image_url"}), on="similar_photo_id")
+    leading = ["id", "image_url", "similar_photo_id", "The_image_url"]
+    return frame[leading + [column for column in pairs.columns if column not in leading]]
+
+
+# Function to answer a tag-similarity catalog query from its parameters: the
+# top_k photos most similar to photo_id when one is given, otherwise up to
+# max_pairs similar pairs (exact, or MinHash/LSH when approximate is set). Returns
+# (frame with image URLs, description of how it was computed).
+def answer_query(index, conn, params, max_pairs=MAX_PAIRS):
+    min_shared = params.get("min_shared", 3)
+    min_jaccard = params.get("min_jaccard", 0.0)
+    if params.get("photo_id") is not None:
+        photo_id, top_k = params["photo_id"], params.get("top_k", 10)
+        pairs = index.similar_to(photo_id, k=top_k, min_shared=min_shared, min_jaccard=min_jaccard)
+        method = f"Top {top_k} photos sharing at least {min_shared} tags with photo {photo_id}"
+    elif params.get("approximate") and min_jaccard > 0:
+        pairs = index.approximate_pairs(threshold=min_jaccard, min_shared=min_shared, limit=max_pairs + 1)
+        method = (f"MinHash/LSH candidates verified exactly: photo pairs with Jaccard ≥ {min_jaccard:.2f} sharing at "
+                  f"least {min_shared} tags; a pair at the threshold is found with probability "
+                  f"{lsh_recall(min_jaccard, min_jaccard):.0%}, and more similar pairs more often")
+    else:
+        pairs = index.similar_pairs(min_shared=min_shared, min_jaccard=min_jaccard, limit=max_pairs + 1)
+        method = f"Photo pairs sharing at least {min_shared} tags (Jaccard ≥ {min_jaccard:.2f})"
+        if params.get("approximate"):
+            method = "Exact, since MinHash/LSH needs a minimum Jaccard similarity above 0: " + method
+    if len(pairs) > max_pairs:
+        pairs = pairs.head(max_pairs)
+        method += f" — truncated to the first {max_pairs:,} pairs found; raise the minimum shared tags or Jaccard"
+    return with_image_urls(conn, pairs), method